@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Technology Fingerprinting
+Classifies a target's stack from its front page and favicon so scanners
+for products it is clearly not running can be skipped
+
+Each technology is a tag with markers; any one marker is enough:
+  headers   Response header name -> words its value contains (case-insensitive)
+  cookies   Cookie name prefixes (case-insensitive)
+  body      Words the front page contains (case-insensitive)
+  favicon   Shodan-style favicon hashes (murmur3 of the base64-encoded icon)
+"""
+
+import base64
+from typing import FrozenSet, NamedTuple
+from urllib.parse import urljoin
+
+import requests
+
+from .signature_engine import ENGINE, AhoCorasick
+
+
+TECHNOLOGIES = {
+    'apache': {
+        'headers': {'Server': ['apache']},
+    },
+    'checkpoint': {
+        'headers': {'Server': ['check point']},
+        'cookies': ['cpcvpn_'],
+        'body': ['check point', 'checkpoint'],
+    },
+    'cisco-asa': {
+        'cookies': ['webvpn'],
+        'body': ['+cscoe+', '+cscot+', 'webvpn'],
+    },
+    'citrix': {
+        'cookies': ['nsc_', 'citrix_ns_id'],
+        'body': ['citrix', 'netscaler'],
+    },
+    'cpanel': {
+        'headers': {'Server': ['cpsrvd']},
+        'cookies': ['cpsession', 'whostmgrsession'],
+        'body': ['cpanel', 'whm'],
+    },
+    'fortinet': {
+        'cookies': ['svpncookie', 'apscookie'],
+        'body': ['fortinet', 'fortigate', 'fgt_lang', '/remote/login'],
+        'favicon': [945408572],
+    },
+    'gitlab': {
+        'cookies': ['_gitlab_session'],
+        'body': ['gitlab'],
+        'favicon': [1278323681],
+    },
+    'grafana': {
+        'cookies': ['grafana_session'],
+        'body': ['grafana'],
+        'favicon': [2123863676],
+    },
+    'iis': {
+        'headers': {'Server': ['microsoft-iis'], 'X-Powered-By': ['asp.net']},
+        'cookies': ['aspsessionid', 'asp.net_sessionid'],
+    },
+    'ivanti': {
+        'cookies': ['dsid', 'dssigninurl'],
+        'body': ['ivanti', 'pulse secure', '/dana-na/'],
+    },
+    'joomla': {
+        'body': ['joomla', '/media/jui/', 'com_content'],
+    },
+    'keycloak': {
+        'cookies': ['keycloak_', 'kc_restart'],
+        'body': ['keycloak'],
+    },
+    'laravel': {
+        'cookies': ['laravel_session', 'xsrf-token'],
+        'body': ['laravel'],
+    },
+    'nexus': {
+        'headers': {'Server': ['nexus']},
+        'body': ['nexus repository', 'sonatype'],
+    },
+    'ofbiz': {
+        'cookies': ['ofbiz'],
+        'body': ['ofbiz'],
+    },
+    'sap': {
+        'headers': {'Server': ['sap'], 'sap-server': ['true']},
+        'cookies': ['sap-usercontext', 'mysapsso2'],
+        'body': ['sap netweaver', 'sap-system'],
+    },
+    'superset': {
+        'body': ['superset'],
+    },
+    'tomcat': {
+        'headers': {'Server': ['tomcat', 'apache-coyote']},
+        'body': ['apache tomcat'],
+    },
+    'wordpress': {
+        'headers': {'Link': ['api.w.org']},
+        'cookies': ['wordpress_', 'wp-settings'],
+        'body': ['wp-content', 'wp-includes', 'wordpress'],
+    },
+    'zimbra': {
+        'cookies': ['zm_test', 'zm_auth_token'],
+        'body': ['zimbra'],
+    },
+}
+
+# Front page and favicon
+FINGERPRINT_REQUESTS = 2
+
+_BODY_WORDS = AhoCorasick(
+    word for markers in TECHNOLOGIES.values() for word in markers.get('body', [])
+)
+_BODY_TAGS = [
+    {tag for tag, markers in TECHNOLOGIES.items() if word in markers.get('body', [])}
+    for word in _BODY_WORDS.patterns
+]
+
+
+class Fingerprint(NamedTuple):
+    """Technologies seen on a target"""
+    tags: FrozenSet[str]
+    requests: int
+    # False when the front page could not be fetched; nothing should be pruned then
+    complete: bool
+
+
+def murmur3_32(data: bytes, seed: int = 0) -> int:
+    """MurmurHash3 (x86, 32-bit) as a signed integer, the value mmh3.hash() returns"""
+    mask = 0xffffffff
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+
+    def scramble(k: int) -> int:
+        k = (k * c1) & mask
+        k = ((k << 15) | (k >> 17)) & mask
+        return (k * c2) & mask
+
+    h = seed & mask
+    whole = len(data) & ~3
+    for i in range(0, whole, 4):
+        h ^= scramble(int.from_bytes(data[i:i + 4], 'little'))
+        h = ((h << 13) | (h >> 19)) & mask
+        h = (h * 5 + 0xe6546b64) & mask
+    if len(data) > whole:
+        h ^= scramble(int.from_bytes(data[whole:], 'little'))
+
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & mask
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & mask
+    h ^= h >> 16
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def favicon_hash(content: bytes) -> int:
+    """Favicon hash as indexed by Shodan (http.favicon.hash)"""
+    return murmur3_32(base64.encodebytes(content))
+
+
+def fingerprint(target: str, session: requests.Session, timeout: float = 10) -> Fingerprint:
+    """
+    Classify the technologies behind a target
+
+    The front page response is handed to the signature engine, so the
+    scanners probing the target root do not request it again.
+    """
+    try:
+        resp = session.get(target, timeout=timeout, verify=False)
+    except Exception:
+        return Fingerprint(frozenset(), 1, False)
+    ENGINE.record('GET', urljoin(target, ''), resp)
+
+    body_words = _BODY_WORDS.search(resp.text.lower())
+    tags = {tag for index in body_words for tag in _BODY_TAGS[index]}
+    cookies = [name.lower() for name in session.cookies.keys()]
+
+    favicon = None
+    try:
+        icon = session.get(urljoin(resp.url, '/favicon.ico'), timeout=timeout, verify=False)
+        if icon.status_code == 200 and icon.content:
+            favicon = favicon_hash(icon.content)
+    except Exception:
+        pass
+
+    for tag, markers in TECHNOLOGIES.items():
+        if tag in tags:
+            continue
+        if any(word in resp.headers.get(header, '').lower()
+               for header, words in markers.get('headers', {}).items() for word in words):
+            tags.add(tag)
+        elif any(name.startswith(prefix) for prefix in markers.get('cookies', []) for name in cookies):
+            tags.add(tag)
+        elif favicon in markers.get('favicon', []):
+            tags.add(tag)
+
+    return Fingerprint(frozenset(tags), FINGERPRINT_REQUESTS, True)
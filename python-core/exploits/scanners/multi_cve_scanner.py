@@ -8,105 +8,53 @@ import argparse
 import sys
 import requests
 from pathlib import Path
-from urllib.parse import urljoin
 from typing import List, Dict, Tuple
 from requests.packages.urllib3.exceptions import InsecureRequestWarning
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from shared import Theme, Signature, BannerDisplay
+from shared import Theme, Signature, BannerDisplay, pooled_session
+from scanners.signature_engine import SignatureScanner
 
 requests.packages.urllib3.disable_warnings(InsecureRequestWarning)
 
 
-class ScannerBase:
+class ScannerBase(SignatureScanner):
     """Base class for all vulnerability scanners"""
     
     def __init__(self, target: str, timeout: int = 10):
         self.target = target if target.startswith('http') else f"https://{target}"
         self.timeout = timeout
-        self.session = requests.Session()
-        
-    def scan(self) -> Tuple[bool, str]:
-        """Override in child classes"""
-        raise NotImplementedError
+        self.session = pooled_session()
 
 
 class CVE_2021_42063_Scanner(ScannerBase):
     """SAP Knowledge Warehouse XSS Scanner"""
     
-    def scan(self) -> Tuple[bool, str]:
-        paths = ['/irj/portal', '/sap/bc/gui/sap/its/webgui']
-        for path in paths:
-            try:
-                url = urljoin(self.target, path)
-                resp = self.session.get(url, timeout=self.timeout, verify=False)
-                if 'SAP' in resp.text and resp.status_code == 200:
-                    return True, f"Potential SAP instance found at {path}"
-            except:
-                pass
-        return False, "SAP instance not detected"
+    signature = 'CVE-2021-42063'
 
 
 class CVE_2018_8033_Scanner(ScannerBase):
     """Apache OFBiz XXE Injection Scanner"""
     
-    def scan(self) -> Tuple[bool, str]:
-        paths = ['/webtools/control/main', '/catalog/control/main']
-        for path in paths:
-            try:
-                url = urljoin(self.target, path)
-                resp = self.session.get(url, timeout=self.timeout, verify=False)
-                if 'OFBiz' in resp.text or 'Apache OFBiz' in resp.headers.get('Server', ''):
-                    return True, f"Apache OFBiz detected at {path}"
-            except:
-                pass
-        return False, "Apache OFBiz not detected"
+    signature = 'CVE-2018-8033'
 
 
 class CVE_2023_27524_Scanner(ScannerBase):
     """Apache Superset Authentication Bypass Scanner"""
     
-    def scan(self) -> Tuple[bool, str]:
-        try:
-            url = urljoin(self.target, '/api/v1/security/login')
-            resp = self.session.get(url, timeout=self.timeout, verify=False)
-            if resp.status_code in [200, 405] and 'superset' in resp.text.lower():
-                return True, "Apache Superset instance detected"
-        except:
-            pass
-        return False, "Apache Superset not detected"
+    signature = 'CVE-2023-27524'
 
 
 class PHPInfoLeakScanner(ScannerBase):
     """PHP Info File Leak Scanner"""
     
-    def scan(self) -> Tuple[bool, str]:
-        paths = ['/phpinfo.php', '/info.php', '/test.php', '/php.php', '/i.php']
-        for path in paths:
-            try:
-                url = urljoin(self.target, path)
-                resp = self.session.get(url, timeout=self.timeout, verify=False)
-                if 'PHP Version' in resp.text or 'phpinfo()' in resp.text:
-                    return True, f"PHPInfo leak found at {path}"
-            except:
-                pass
-        return False, "No PHPInfo leaks detected"
+    signature = 'phpinfo-files-leaks'
 
 
 class ShellHistoryLeakScanner(ScannerBase):
     """Shell History File Leak Scanner"""
     
-    def scan(self) -> Tuple[bool, str]:
-        paths = ['/.bash_history', '/.zsh_history', '/.sh_history', '/.history']
-        for path in paths:
-            try:
-                url = urljoin(self.target, path)
-                resp = self.session.get(url, timeout=self.timeout, verify=False)
-                if resp.status_code == 200 and len(resp.text) > 10:
-                    return True, f"Shell history leak found at {path}"
-            except:
-                pass
-        return False, "No shell history leaks detected"
+    signature = 'shell-history-leaks'
 
 
 class CRLFInjectionScanner(ScannerBase):
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Path-Probe Signature Engine
+Compiles the SIGNATURES table once at load time: every body word of every
+signature goes into one Aho-Corasick automaton, so each response is
+searched in a single pass however many scanners look at it. Requests
+several scanners share are deduplicated by the pooled sessions' response
+cache, not here
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from .signatures import SIGNATURES
+
+
+# Probe results remembered per run; they hold word ids and headers, not bodies
+PROBE_CACHE_ENTRIES = 4096
+# Bodies whose automaton matches are remembered, keyed by digest
+WORD_MEMO_ENTRIES = 4096
+
+MATCHER_KEYS = frozenset({'status', 'words', 'nocase', 'header', 'longer_than'})
+SIGNATURE_KEYS = frozenset({'name', 'tags', 'paths', 'method', 'url', 'condition', 'matchers', 'found',
+                            'not_found'})
+
+
+class AhoCorasick:
+    """
+    Multi-pattern substring search: one pass over a text finds every
+    pattern it contains, overlapping ones included
+
+    The trie and its failure links are flattened into a DFA over the
+    patterns' alphabet, so each character costs a single dict lookup.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        if any(not pattern for pattern in self.patterns):
+            raise ValueError("Empty search pattern")
+
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                following = goto[state].get(char)
+                if following is None:
+                    following = goto[state][char] = len(goto)
+                    goto.append({})
+                    outputs.append(set())
+                state = following
+            outputs[state].add(index)
+
+        # Breadth-first, so a state's failure target is complete before the state itself
+        alphabet = {char for pattern in self.patterns for char in pattern}
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            outputs[state] |= outputs[fail[state]]
+            for char in alphabet:
+                following = goto[state].get(char)
+                if following is not None:
+                    fail[following] = delta[fail[state]].get(char, 0)
+                    delta[state][char] = following
+                    queue.append(following)
+                else:
+                    fallback = delta[fail[state]].get(char, 0)
+                    if fallback:
+                        delta[state][char] = fallback
+
+        self.delta = delta
+        self.outputs: List[Tuple[int, ...]] = [tuple(sorted(found)) for found in outputs]
+
+    def search(self, text: str) -> FrozenSet[int]:
+        """Indexes (into self.patterns) of the patterns found in text"""
+        delta, outputs = self.delta, self.outputs
+        found = set()
+        state = 0
+        for char in text:
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return frozenset(found)
+
+
+class ProbeResult(NamedTuple):
+    """What the matchers need from one response"""
+    status: int
+    headers: requests.structures.CaseInsensitiveDict
+    length: int
+    words: FrozenSet[int]
+    nocase_words: FrozenSet[int]
+
+
+class Matcher(NamedTuple):
+    """A compiled matcher; `words` holds automaton indexes for body matchers"""
+    status: Optional[FrozenSet[int]] = None
+    words: Optional[FrozenSet[int]] = None
+    header: Optional[str] = None
+    header_words: Tuple[str, ...] = ()
+    nocase: bool = False
+    longer_than: Optional[int] = None
+
+    def matches(self, probe: ProbeResult) -> bool:
+        if self.status is not None:
+            return probe.status in self.status
+        if self.longer_than is not None:
+            return probe.length > self.longer_than
+        if self.header is not None:
+            value = probe.headers.get(self.header, '')
+            if self.nocase:
+                value = value.lower()
+            return any(word in value for word in self.header_words)
+        found = probe.nocase_words if self.nocase else probe.words
+        return not self.words.isdisjoint(found)
+
+
+class Signature(NamedTuple):
+    """A compiled signature"""
+    name: str
+    tags: FrozenSet[str]
+    method: str
+    paths: Tuple[str, ...]
+    append: bool
+    any_matcher: bool
+    matchers: Tuple[Matcher, ...]
+    found: str
+    not_found: str
+
+    def url(self, target: str, path: str) -> str:
+        return target + path if self.append else urljoin(target, path)
+
+    def matches(self, probe: ProbeResult) -> bool:
+        results = (matcher.matches(probe) for matcher in self.matchers)
+        return any(results) if self.any_matcher else all(results)
+
+    def report(self, path: str, probe: ProbeResult) -> Tuple[bool, str]:
+        return True, self.found.format(path=path, file=path.lstrip('/'), headers=probe.headers)
+
+
+class SignatureEngine:
+    """
+    Evaluates compiled signatures against targets
+
+    Every probe goes through the scanner's session, so identical requests
+    are answered by the pool's response cache (and sent every time when
+    it is disabled). A body seen before is not searched again. The result
+    of each (method, URL) is also kept for cached_run(), which only
+    reports and never stands in for a request.
+    """
+
+    def __init__(self, signatures: Dict[str, dict], cache_entries: int = PROBE_CACHE_ENTRIES,
+                 memo_entries: int = WORD_MEMO_ENTRIES):
+        """
+        Compile a signature table
+
+        Raises:
+            ValueError: If a signature or matcher is malformed
+        """
+        words: Dict[str, int] = {}
+        nocase_words: Dict[str, int] = {}
+        self.signatures: Dict[str, Signature] = {
+            name: self._compile(name, definition, words, nocase_words)
+            for name, definition in signatures.items()
+        }
+        self.words = AhoCorasick(words)
+        self.nocase_words = AhoCorasick(nocase_words)
+        self.cache_entries = cache_entries
+        self.memo_entries = memo_entries
+        self.lock = threading.Lock()
+        self.probes: 'OrderedDict[Tuple[str, str], ProbeResult]' = OrderedDict()
+        # Body digest -> (words, nocase_words)
+        self.memo: 'OrderedDict[bytes, Tuple[FrozenSet[int], FrozenSet[int]]]' = OrderedDict()
+
+    @staticmethod
+    def _compile(name: str, definition: dict, words: Dict[str, int],
+                 nocase_words: Dict[str, int]) -> Signature:
+        unknown = set(definition) - SIGNATURE_KEYS
+        if unknown:
+            raise ValueError(f"Signature {name}: unknown keys {sorted(unknown)}")
+        condition = definition.get('condition', 'and')
+        url_style = definition.get('url', 'join')
+        if condition not in ('and', 'or') or url_style not in ('join', 'append'):
+            raise ValueError(f"Signature {name}: condition must be and/or, url join/append")
+        if not definition.get('paths') or not definition.get('matchers'):
+            raise ValueError(f"Signature {name}: needs paths and matchers")
+
+        matchers = []
+        for spec in definition['matchers']:
+            unknown = set(spec) - MATCHER_KEYS
+            if unknown:
+                raise ValueError(f"Signature {name}: unknown matcher keys {sorted(unknown)}")
+            nocase = spec.get('nocase', False)
+            if 'status' in spec:
+                matchers.append(Matcher(status=frozenset(spec['status'])))
+            elif 'longer_than' in spec:
+                matchers.append(Matcher(longer_than=spec['longer_than']))
+            elif 'words' in spec and 'header' in spec:
+                header_words = tuple(word.lower() if nocase else word for word in spec['words'])
+                matchers.append(Matcher(header=spec['header'], header_words=header_words, nocase=nocase))
+            elif 'words' in spec:
+                # Body words are numbered in the engine-wide automaton of their case mode
+                table = nocase_words if nocase else words
+                ids = frozenset(
+                    table.setdefault(word.lower() if nocase else word, len(table))
+                    for word in spec['words']
+                )
+                matchers.append(Matcher(words=ids, nocase=nocase))
+            else:
+                raise ValueError(f"Signature {name}: matcher needs status, words or longer_than")
+
+        return Signature(
+            name=definition.get('name', name),
+            tags=frozenset(definition.get('tags', [])),
+            method=definition.get('method', 'GET').upper(),
+            paths=tuple(definition['paths']),
+            append=url_style == 'append',
+            any_matcher=condition == 'or',
+            matchers=tuple(matchers),
+            found=definition['found'],
+            not_found=definition['not_found'],
+        )
+
+    def probe(self, session: requests.Session, method: str, url: str, timeout: float) -> ProbeResult:
+        """Send a request and search its response"""
+        # Same redirect handling as session.get()/options()/head()
+        resp = session.request(method, url, timeout=timeout, verify=False,
+                               allow_redirects=method != 'HEAD')
+        return self.record(method, url, resp)
+
+    def search(self, text: str) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """Body words and case-insensitive body words found in text, from the memo when seen before"""
+        digest = hashlib.blake2b(text.encode('utf-8', errors='surrogatepass'), digest_size=16).digest()
+        with self.lock:
+            found = self.memo.get(digest)
+            if found is not None:
+                self.memo.move_to_end(digest)
+                return found
+        found = self.words.search(text), self.nocase_words.search(text.lower())
+        with self.lock:
+            self.memo[digest] = found
+            if len(self.memo) > self.memo_entries:
+                self.memo.popitem(last=False)
+        return found
+
+    def record(self, method: str, url: str, resp: requests.Response) -> ProbeResult:
+        """Search a response, remembering the result as the probe result for (method, url)"""
+        text = resp.text
+        words, nocase_words = self.search(text)
+        result = ProbeResult(
+            status=resp.status_code,
+            headers=resp.headers,
+            length=len(text),
+            words=words,
+            nocase_words=nocase_words,
+        )
+        with self.lock:
+            self.probes[(method, url)] = result
+            self.probes.move_to_end((method, url))
+            if len(self.probes) > self.cache_entries:
+                self.probes.popitem(last=False)
+        return result
+
+    def run(self, name: str, target: str, session: requests.Session, timeout: float) -> Tuple[bool, str]:
+        """
+        Evaluate one signature: probe its paths in order and report the first match
+
+        Raises:
+            KeyError: If there is no signature by that name
+        """
+        signature = self.signatures[name]
+        for path in signature.paths:
+            try:
+                probe = self.probe(session, signature.method, signature.url(target, path), timeout)
+            except Exception:
+                continue
+            if signature.matches(probe):
+                return signature.report(path, probe)
+        return False, signature.not_found
+
+    def cached_run(self, name: str, target: str) -> Optional[Tuple[bool, str]]:
+        """
+        Evaluate one signature from remembered probe results only, without
+        sending anything
+
+        Returns:
+            None when a path it would probe has not been requested yet
+        """
+        signature = self.signatures[name]
+        for path in signature.paths:
+            with self.lock:
+                probe = self.probes.get((signature.method, signature.url(target, path)))
+            if probe is None:
+                return None
+            if signature.matches(probe):
+                return signature.report(path, probe)
+        return False, signature.not_found
+
+
+# Compiled once, when the scanner modules are loaded
+ENGINE = SignatureEngine(SIGNATURES)
+
+
+class SignatureScanner:
+    """
+    Mixin for scanner classes defined by a SIGNATURES entry
+
+    Subclasses name their entry in `signature`; scanners with custom logic
+    override scan() instead and list the technologies they target in `tags`.
+    """
+
+    signature: Optional[str] = None
+    tags: Tuple[str, ...] = ()
+
+    @classmethod
+    def technologies(cls) -> FrozenSet[str]:
+        """Technology tags the scanner applies to; empty when it applies to any target"""
+        if cls.signature is not None:
+            return ENGINE.signatures[cls.signature].tags
+        return frozenset(cls.tags)
+
+    @classmethod
+    def probe_count(cls) -> int:
+        """Requests a scan sends to a target that does not match"""
+        if cls.signature is not None:
+            return len(ENGINE.signatures[cls.signature].paths)
+        return 1
+
+    def scan(self) -> Tuple[bool, str]:
+        if self.signature is None:
+            raise NotImplementedError
+        return ENGINE.run(self.signature, self.target, self.session, self.timeout)
+
+    def cached_scan(self) -> Optional[Tuple[bool, str]]:
+        """What scan() would report, if every response it needs has already been seen"""
+        if self.signature is None:
+            return None
+        return ENGINE.cached_run(self.signature, self.target)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Path-Probe Signatures
+Scanners that request a few paths and look at the status code, body
+words or headers of each response, expressed as data
+
+Each signature is keyed by its ALL_SCANNERS name:
+  tags        Technologies (scanners/fingerprint.py) the signature applies to;
+              untagged signatures run against every target
+  paths       Paths probed in order; the first one that matches is reported
+  method      HTTP method (default GET)
+  url         'join' resolves paths against the target URL (default);
+              'append' concatenates them to it
+  matchers    Checks on a response, combined by 'condition' ('and' by default, or 'or'):
+                {'status': [codes]}                     status code is one of codes
+                {'words': [...], 'nocase': bool}        body contains any of the words
+                {'words': [...], 'header': 'Name'}      header value contains any of the words
+                {'longer_than': n}                      body is longer than n characters
+  found       Message when a path matches; {path}, {file} (path without the
+              leading slash) and {headers[Name]} are filled in
+  not_found   Message when no path matches
+"""
+
+BACKUP_NAMES = ['backup', 'database', 'db', 'dump', 'site']
+BACKUP_EXTENSIONS = ['.bak', '.backup', '.old', '.sql', '.zip', '.tar.gz']
+
+
+SIGNATURES = {
+    # Multi-CVE collection
+    'CVE-2021-42063': {
+        'name': 'SAP Knowledge Warehouse XSS',
+        'tags': ['sap'],
+        'paths': ['/irj/portal', '/sap/bc/gui/sap/its/webgui'],
+        'matchers': [{'words': ['SAP']}, {'status': [200]}],
+        'found': 'Potential SAP instance found at {path}',
+        'not_found': 'SAP instance not detected',
+    },
+    'CVE-2018-8033': {
+        'name': 'Apache OFBiz XXE Injection',
+        'tags': ['ofbiz'],
+        'paths': ['/webtools/control/main', '/catalog/control/main'],
+        'condition': 'or',
+        'matchers': [{'words': ['OFBiz']}, {'words': ['Apache OFBiz'], 'header': 'Server'}],
+        'found': 'Apache OFBiz detected at {path}',
+        'not_found': 'Apache OFBiz not detected',
+    },
+    'CVE-2023-27524': {
+        'name': 'Apache Superset Authentication Bypass',
+        'tags': ['superset'],
+        'paths': ['/api/v1/security/login'],
+        'matchers': [{'status': [200, 405]}, {'words': ['superset'], 'nocase': True}],
+        'found': 'Apache Superset instance detected',
+        'not_found': 'Apache Superset not detected',
+    },
+    'phpinfo-files-leaks': {
+        'name': 'PHP Info File Leak',
+        'paths': ['/phpinfo.php', '/info.php', '/test.php', '/php.php', '/i.php'],
+        'matchers': [{'words': ['PHP Version', 'phpinfo()']}],
+        'found': 'PHPInfo leak found at {path}',
+        'not_found': 'No PHPInfo leaks detected',
+    },
+    'shell-history-leaks': {
+        'name': 'Shell History File Leak',
+        'paths': ['/.bash_history', '/.zsh_history', '/.sh_history', '/.history'],
+        'matchers': [{'status': [200]}, {'longer_than': 10}],
+        'found': 'Shell history leak found at {path}',
+        'not_found': 'No shell history leaks detected',
+    },
+
+    # Network devices
+    'CVE-2020-3187': {
+        'name': 'Cisco ASA/FTD Directory Traversal',
+        'tags': ['cisco-asa'],
+        'paths': ['+CSCOE+/session_password.js', '+CSCOT+/translation-table'],
+        'matchers': [{'status': [200]}, {'longer_than': 0}],
+        'found': 'Cisco vulnerability detected at {path}',
+        'not_found': 'Not vulnerable',
+    },
+    'CVE-2020-3452': {
+        'name': 'Cisco ASA Path Traversal',
+        'tags': ['cisco-asa'],
+        'paths': ['/+CSCOT+/oem-customization?app=AnyConnect&type=../../../',
+                  '/+CSCOT+/translation-table?type=mst&textdomain=/%2bCSCOE%2b/portal_inc.lua'],
+        'url': 'append',
+        'condition': 'or',
+        'matchers': [{'words': ['VPN']}, {'status': [200]}],
+        'found': 'Cisco ASA path traversal vulnerability',
+        'not_found': 'Not vulnerable',
+    },
+    'CVE-2023-24044': {
+        'name': 'Fortinet FortiOS Auth Bypass',
+        'tags': ['fortinet'],
+        'paths': ['/api/v2/cmdb/firewall/address', '/logincheck'],
+        'matchers': [{'words': ['fortinet', 'fortigate'], 'nocase': True}],
+        'found': 'Fortinet device detected',
+        'not_found': 'Fortinet device not detected',
+    },
+    'CVE-2024-24919': {
+        'name': 'Check Point VPN Gateway RCE',
+        'tags': ['checkpoint'],
+        'paths': ['/clients/MyCRL', '/sslvpn/Portal/Main'],
+        'condition': 'or',
+        'matchers': [{'words': ['checkpoint'], 'nocase': True}, {'status': [200, 302]}],
+        'found': 'Check Point VPN detected',
+        'not_found': 'Not vulnerable',
+    },
+    'CVE-2018-0296': {
+        'name': 'Cisco ASA Denial of Service',
+        'tags': ['cisco-asa'],
+        'paths': [''],
+        'matchers': [{'words': ['cisco', 'asa'], 'header': 'Server', 'nocase': True}],
+        'found': 'Cisco ASA device detected',
+        'not_found': 'Not vulnerable',
+    },
+
+    # Enterprise applications
+    'CVE-2021-20323': {
+        'name': 'Keycloak Request URI Bypass',
+        'tags': ['keycloak'],
+        'paths': ['/auth/admin/master/console/', '/auth/realms/master'],
+        'matchers': [{'words': ['keycloak'], 'nocase': True}],
+        'found': 'Keycloak instance detected',
+        'not_found': 'Keycloak not detected',
+    },
+    'CVE-2023-29489': {
+        'name': 'cPanel Unauthenticated Command Injection',
+        'tags': ['cpanel'],
+        'paths': ['/cpsess', '/cpanel', '/login/?login_only=1'],
+        'matchers': [{'words': ['cpanel', 'whm'], 'nocase': True}],
+        'found': 'cPanel instance detected',
+        'not_found': 'cPanel not detected',
+    },
+    'CVE-2019-9670': {
+        'name': 'Zimbra XXE Injection',
+        'tags': ['zimbra'],
+        'paths': ['/zimbra/', '/service/soap'],
+        'matchers': [{'words': ['zimbra'], 'nocase': True}],
+        'found': 'Zimbra instance detected',
+        'not_found': 'Zimbra not detected',
+    },
+    'CVE-2020-27838': {
+        'name': 'Ghostscript Type Confusion RCE',
+        'paths': [''],
+        'matchers': [{'words': ['ghostscript', 'imagemagick'], 'nocase': True}],
+        'found': 'Image processing service detected',
+        'not_found': 'Not applicable',
+    },
+    'CVE-2021-40438': {
+        'name': 'Apache HTTP Server SSRF',
+        'tags': ['apache'],
+        'paths': [''],
+        'matchers': [{'words': ['apache'], 'header': 'Server', 'nocase': True}],
+        'found': 'Apache HTTP Server detected: {headers[Server]}',
+        'not_found': 'Apache not detected',
+    },
+    'CVE-2021-24917': {
+        'name': 'WordPress Wordfence WAF Bypass',
+        'tags': ['wordpress'],
+        'paths': ['/wp-admin/', '/wp-login.php', '/wp-content/plugins/wordfence/'],
+        'condition': 'or',
+        'matchers': [{'words': ['wordpress'], 'nocase': True}, {'words': ['wp-']}],
+        'found': 'WordPress detected at {path}',
+        'not_found': 'WordPress not detected',
+    },
+
+    # Legacy systems
+    'CVE-2017-7269': {
+        'name': 'IIS 6.0 WebDAV Buffer Overflow',
+        'tags': ['iis'],
+        'paths': [''],
+        'method': 'OPTIONS',
+        'matchers': [{'words': ['IIS/6.0'], 'header': 'Server'}],
+        'found': 'IIS 6.0 detected - potentially vulnerable',
+        'not_found': 'IIS 6.0 not detected',
+    },
+    'CVE-2015-1635': {
+        'name': 'IIS HTTP.sys RCE',
+        'tags': ['iis'],
+        'paths': [''],
+        'matchers': [{'words': ['IIS'], 'header': 'Server'}],
+        'found': 'IIS server detected: {headers[Server]}',
+        'not_found': 'IIS not detected',
+    },
+    'CVE-2015-7297': {
+        'name': 'Joomla SQL Injection',
+        'tags': ['joomla'],
+        'paths': ['/administrator/', '/index.php/component/users/'],
+        'condition': 'or',
+        'matchers': [{'words': ['joomla'], 'nocase': True}, {'words': ['administrator']}],
+        'found': 'Joomla instance detected',
+        'not_found': 'Joomla not detected',
+    },
+    'CVE-2000-0114': {
+        'name': 'IIS 4.0/5.0 RDS Exploit',
+        'tags': ['iis'],
+        'paths': ['/msadc/', '/scripts/', '/_vti_bin/'],
+        'matchers': [{'status': [200]}],
+        'found': 'Legacy IIS path accessible: {path}',
+        'not_found': 'Legacy paths not accessible',
+    },
+    'CVE-2018-11784': {
+        'name': 'Apache Tomcat Open Redirect',
+        'tags': ['tomcat'],
+        'paths': [''],
+        'condition': 'or',
+        'matchers': [
+            {'words': ['tomcat'], 'header': 'Server', 'nocase': True},
+            {'words': ['Apache-Coyote'], 'header': 'Server'},
+        ],
+        'found': 'Apache Tomcat detected: {headers[Server]}',
+        'not_found': 'Tomcat not detected',
+    },
+
+    # Specialized
+    'CVE-2022-0165': {
+        'name': 'GitLab CE/EE ExifTool RCE',
+        'tags': ['gitlab'],
+        'paths': ['/users/sign_in', '/api/v4/version'],
+        'matchers': [{'words': ['gitlab'], 'nocase': True}],
+        'found': 'GitLab instance detected',
+        'not_found': 'GitLab not detected',
+    },
+    'CVE-2024-1208': {
+        'name': 'Grafana Authentication Bypass',
+        'tags': ['grafana'],
+        'paths': ['/login', '/api/health'],
+        'matchers': [{'words': ['grafana'], 'nocase': True}],
+        'found': 'Grafana instance detected',
+        'not_found': 'Grafana not detected',
+    },
+    'CVE-2023-46805': {
+        'name': 'Ivanti Connect Secure Auth Bypass',
+        'tags': ['ivanti'],
+        'paths': ['/api/v1/totp/user-backup-code/', '/dana-na/auth/url_default/welcome.cgi'],
+        'condition': 'or',
+        'matchers': [{'words': ['ivanti'], 'nocase': True}, {'status': [200, 302]}],
+        'found': 'Ivanti Connect Secure detected',
+        'not_found': 'Ivanti not detected',
+    },
+    'CVE-2019-12616': {
+        'name': 'WordPress Simple Cart Shopping Path Traversal',
+        'tags': ['wordpress'],
+        'paths': ['/wp-content/plugins/wp-simple-shopping-cart/'],
+        'matchers': [{'status': [200]}],
+        'found': 'WordPress Simple Cart plugin detected',
+        'not_found': 'Plugin not detected',
+    },
+    'CVE-2024-4956': {
+        'name': 'Sonatype Nexus RCE',
+        'tags': ['nexus'],
+        'paths': ['/service/rest/v1/status', '/#browse/browse'],
+        'matchers': [{'words': ['nexus'], 'nocase': True}],
+        'found': 'Sonatype Nexus detected',
+        'not_found': 'Nexus not detected',
+    },
+    'CVE-2020-35489': {
+        'name': 'WordPress Contact Form 7 File Upload',
+        'tags': ['wordpress'],
+        'paths': ['/wp-content/plugins/contact-form-7/'],
+        'matchers': [{'status': [200]}],
+        'found': 'Contact Form 7 plugin detected',
+        'not_found': 'Plugin not detected',
+    },
+    'CVE-2023-4568': {
+        'name': 'WooCommerce Payments Plugin RCE',
+        'tags': ['wordpress'],
+        'paths': ['/wp-content/plugins/woocommerce-payments/', '/wp-json/wc/v3/'],
+        'condition': 'or',
+        'matchers': [{'words': ['woocommerce'], 'nocase': True}, {'status': [200]}],
+        'found': 'WooCommerce detected',
+        'not_found': 'WooCommerce not detected',
+    },
+    'CVE-2023-5089': {
+        'name': 'WordPress Royal Elementor Addons LFI',
+        'tags': ['wordpress'],
+        'paths': ['/wp-content/plugins/royal-elementor-addons/'],
+        'matchers': [{'status': [200]}],
+        'found': 'Royal Elementor plugin detected',
+        'not_found': 'Plugin not detected',
+    },
+
+    # File leaks
+    'appspec-yaml-leaks': {
+        'name': 'AWS CodeDeploy appspec.yaml Leak',
+        'paths': ['/appspec.yaml', '/appspec.yml', '/.appspec.yaml'],
+        'matchers': [{'status': [200]}, {'words': ['version', 'hooks']}],
+        'found': 'appspec.yaml leak found at {path}',
+        'not_found': 'No appspec.yaml leaks',
+    },
+    'behat-config-leaks': {
+        'name': 'Behat Config File Leak',
+        'paths': ['/behat.yml', '/behat.yml.dist', '/config/behat.yml'],
+        'matchers': [{'status': [200]}, {'words': ['behat'], 'nocase': True}],
+        'found': 'Behat config leak found at {path}',
+        'not_found': 'No Behat config leaks',
+    },
+    'laravel-ignition-Rxss': {
+        'name': 'Laravel Ignition Reflected XSS',
+        'tags': ['laravel'],
+        'paths': ['/_ignition/execute-solution', '/_ignition/health-check'],
+        'condition': 'or',
+        'matchers': [{'words': ['ignition'], 'nocase': True}, {'status': [200]}],
+        'found': 'Laravel Ignition endpoint detected',
+        'not_found': 'Laravel Ignition not detected',
+    },
+    'citrix-netscaler-memory-leak': {
+        'name': 'Citrix NetScaler Memory Leak (CVE-2023-4966 - Citrix Bleed)',
+        'tags': ['citrix'],
+        'paths': ['/vpn/index.html', '/logon/LogonPoint/index.html'],
+        'matchers': [{'words': ['citrix', 'netscaler'], 'nocase': True}],
+        'found': 'Citrix NetScaler Gateway detected',
+        'not_found': 'Citrix not detected',
+    },
+    '.env-leaks': {
+        'name': '.env File Leak',
+        'paths': ['/.env', '/.env.local', '/.env.production', '/.env.development', '/.env.backup'],
+        'matchers': [{'status': [200]}, {'words': ['=', 'APP_', 'DB_']}],
+        'found': '.env file leak found at {path}',
+        'not_found': 'No .env file leaks',
+    },
+    '.git-exposure': {
+        'name': '.git Directory Leak',
+        'paths': ['/.git/config', '/.git/HEAD', '/.git/index'],
+        'matchers': [{'status': [200]}, {'longer_than': 0}],
+        'found': '.git directory exposed at {path}',
+        'not_found': 'No .git exposure',
+    },
+    'dockerfile-leaks': {
+        'name': 'Dockerfile Leak',
+        'paths': ['/Dockerfile', '/docker-compose.yml', '/docker-compose.yaml', '/.dockerignore'],
+        'matchers': [{'status': [200]}, {'words': ['FROM', 'version']}],
+        'found': 'Docker config leak found at {path}',
+        'not_found': 'No Docker config leaks',
+    },
+    'backup-file-leaks': {
+        'name': 'Backup File Leak',
+        'paths': [f'/{name}{extension}' for name in BACKUP_NAMES for extension in BACKUP_EXTENSIONS],
+        'method': 'HEAD',
+        'matchers': [{'status': [200]}],
+        'found': 'Backup file found: {file}',
+        'not_found': 'No backup files exposed',
+    },
+    'config-file-leaks': {
+        'name': 'Configuration File Leak',
+        'paths': ['/config.php', '/configuration.php', '/wp-config.php', '/config.yml',
+                  '/settings.php', '/parameters.yml', '/database.yml'],
+        'matchers': [{'status': [200]}, {'words': ['password', 'database'], 'nocase': True}],
+        'found': 'Config file leak found at {path}',
+        'not_found': 'No config file leaks',
+    },
+}
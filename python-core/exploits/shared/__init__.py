@@ -5,5 +5,9 @@ Shared utilities for POC exploits
 from .theme import Theme
 from .signature import Signature
 from .banner import BannerDisplay
+from .http_pool import HTTPPool, configure_pool, pooled_session
+from .response_cache import ResponseCache
+from .host_scheduler import HostScheduler
 
-__all__ = ['Theme', 'Signature', 'BannerDisplay']
+__all__ = ['Theme', 'Signature', 'BannerDisplay', 'HTTPPool', 'configure_pool', 'pooled_session',
+           'ResponseCache', 'HostScheduler']
@@ -0,0 +1,215 @@
+"""
+Host-aware job scheduler for multi-target scans
+Jobs from many targets share one set of worker threads; a per-host cap
+keeps a slow or rate-limiting host from tying up more than its share of
+them, and hosts with work waiting are served round-robin
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+
+# Seconds between deadline checks on running jobs
+WATCHDOG_POLL = 0.1
+
+Done = Callable[[Any, Optional[BaseException]], None]
+
+
+class _Job:
+    """A task waiting for or holding a worker"""
+
+    __slots__ = ('group', 'host', 'task', 'done')
+
+    def __init__(self, group: Hashable, host: str, task: Callable[[], Any], done: Done):
+        self.group = group
+        self.host = host
+        self.task = task
+        self.done = done
+
+
+class HostScheduler:
+    """
+    Runs the jobs of a stream of groups (e.g. targets) with a global and a
+    per-host concurrency cap
+
+    Groups are opened from the input only while fewer than `max_open` are
+    in progress, so a long target list is read as it is worked through
+    rather than up front. Groups must be distinct objects. A group is
+    finished once it has no jobs left; the `done` callback of a job may
+    submit further jobs for its group.
+
+    A job running past the deadline is reported with a TimeoutError and
+    its worker is replaced; the stuck thread cannot be killed, so it is
+    left to finish on its own and then exits. Until it does, the job still
+    counts against its host's cap, since it may still be talking to the
+    host. Workers are daemon threads.
+    """
+
+    def __init__(self, workers: int, per_host: int, deadline: float, max_open: Optional[int] = None):
+        """
+        Initialize the scheduler
+
+        Args:
+            workers: Jobs running at once across all hosts
+            per_host: Jobs running at once against one host
+            deadline: Seconds a job may run before it is given up on
+            max_open: Groups in progress at once (default: twice the workers)
+        """
+        self.workers = workers
+        self.per_host = per_host
+        self.deadline = deadline
+        self.max_open = max_open or 2 * workers
+        self.cond = threading.Condition()
+        self.pending: Dict[str, deque] = {}
+        self.active: Dict[str, int] = {}
+        self.ready: deque = deque()
+        self.queued_hosts = set()
+        self.running: Dict[_Job, float] = {}
+        self.outstanding: Dict[Hashable, int] = {}
+        self.groups = iter(())
+        self.exhausted = True
+        self.open_group: Callable[[Hashable], None] = None
+        self.close_group: Callable[[Hashable], None] = None
+
+    def submit(self, group: Hashable, host: str, task: Callable[[], Any], done: Done):
+        """Queue task against host; done(result, error) is called when it finishes or times out"""
+        with self.cond:
+            self.outstanding[group] = self.outstanding.get(group, 0) + 1
+            self.pending.setdefault(host, deque()).append(_Job(group, host, task, done))
+            self._mark_ready(host)
+            self.cond.notify()
+
+    def run(self, groups: Iterable[Hashable], open_group: Callable[[Hashable], None],
+            close_group: Callable[[Hashable], None]):
+        """
+        Work through groups, returning once every one has finished
+
+        Args:
+            groups: Groups in the order to start them
+            open_group: Called as a group starts; submits its first jobs
+            close_group: Called once the last job of a group is done
+        """
+        self.groups = iter(groups)
+        self.exhausted = False
+        self.open_group = open_group
+        self.close_group = close_group
+
+        threads = [threading.Thread(target=self._worker, daemon=True) for _ in range(self.workers)]
+        for thread in threads:
+            thread.start()
+        watchdog = threading.Thread(target=self._watchdog, daemon=True)
+        watchdog.start()
+
+        with self.cond:
+            while not (self.exhausted and not self.outstanding):
+                self._fill()
+                self.cond.wait(WATCHDOG_POLL)
+            self.cond.notify_all()
+
+    def _mark_ready(self, host: str):
+        """Put host in the round-robin queue if it has work and a free slot (lock held)"""
+        if (host in self.pending and self.active.get(host, 0) < self.per_host
+                and host not in self.queued_hosts):
+            self.queued_hosts.add(host)
+            self.ready.append(host)
+
+    def _fill(self):
+        """Open groups from the input until max_open are in progress (lock held)"""
+        while not self.exhausted and len(self.outstanding) < self.max_open:
+            try:
+                group = next(self.groups)
+            except StopIteration:
+                self.exhausted = True
+                self.cond.notify_all()
+                return
+            # Held open while its first jobs are submitted
+            self.outstanding[group] = 1
+            self.cond.release()
+            try:
+                self.open_group(group)
+            finally:
+                self.cond.acquire()
+            self._release(group)
+
+    def _release(self, group: Hashable):
+        """Drop one job from a group's count, finishing the group at zero (lock held)"""
+        self.outstanding[group] -= 1
+        if self.outstanding[group] == 0:
+            del self.outstanding[group]
+            self.cond.release()
+            try:
+                self.close_group(group)
+            finally:
+                self.cond.acquire()
+            self.cond.notify_all()
+
+    def _next_job(self) -> Optional[_Job]:
+        with self.cond:
+            while True:
+                self._fill()
+                while self.ready:
+                    host = self.ready.popleft()
+                    self.queued_hosts.discard(host)
+                    if host not in self.pending or self.active.get(host, 0) >= self.per_host:
+                        continue
+                    job = self.pending[host].popleft()
+                    if not self.pending[host]:
+                        del self.pending[host]
+                    self.active[host] = self.active.get(host, 0) + 1
+                    self.running[job] = time.monotonic()
+                    # Back of the queue, so other hosts get the next free workers
+                    self._mark_ready(host)
+                    return job
+                if self.exhausted and not self.outstanding:
+                    return None
+                self.cond.wait()
+
+    def _free_slot(self, job: _Job):
+        """Give a finished job's host slot back (lock held)"""
+        self.active[job.host] -= 1
+        if not self.active[job.host]:
+            del self.active[job.host]
+        self._mark_ready(job.host)
+        self.cond.notify_all()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                result, error = job.task(), None
+            except Exception as e:
+                result, error = None, e
+            with self.cond:
+                self._free_slot(job)
+                if job not in self.running:
+                    # The watchdog gave up on this job and started a replacement worker
+                    return
+                del self.running[job]
+            try:
+                job.done(result, error)
+            finally:
+                with self.cond:
+                    self._release(job.group)
+
+    def _watchdog(self):
+        while True:
+            with self.cond:
+                if self.exhausted and not self.outstanding:
+                    return
+                now = time.monotonic()
+                expired = [job for job, started in self.running.items() if now - started > self.deadline]
+                for job in expired:
+                    # The host slot stays taken until the stuck task returns
+                    del self.running[job]
+                    threading.Thread(target=self._worker, daemon=True).start()
+            for job in expired:
+                try:
+                    job.done(None, TimeoutError(f"Timed out after {self.deadline:g}s"))
+                finally:
+                    with self.cond:
+                        self._release(job.group)
+            time.sleep(WATCHDOG_POLL)
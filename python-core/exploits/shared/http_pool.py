@@ -0,0 +1,151 @@
+"""
+Shared HTTP connection pool for scanner sessions
+Every scanner of a run draws its connections from one keep-alive pool
+instead of opening (and TLS-handshaking) its own per target, and
+identical requests are answered from one response cache
+"""
+
+import threading
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+
+from .response_cache import CACHE_BYTES, ResponseCache, wait_bound
+
+
+# Keep-alive connections held open per host; requests beyond this wait for one
+CONNECTIONS_PER_HOST = 10
+# Hosts whose connection pools are kept at once (least recently used are dropped)
+MAX_HOSTS = 32
+# Seconds a request waits for a free pooled connection before failing
+POOL_TIMEOUT = 30.0
+
+
+def _bounded_pool(base: type, timeout: float) -> type:
+    """Connection pool class whose requests wait at most timeout seconds for a free connection"""
+
+    class BoundedPool(base):
+        # urllib3 blocks forever on a full pool unless urlopen() is given a pool_timeout
+        default_pool_timeout = timeout
+
+        def urlopen(self, *args, pool_timeout: Optional[float] = None, **kwargs):
+            if pool_timeout is None:
+                pool_timeout = self.default_pool_timeout
+            return super().urlopen(*args, pool_timeout=pool_timeout, **kwargs)
+
+    return BoundedPool
+
+
+class SharedAdapter(HTTPAdapter):
+    """Transport adapter mounted on many sessions; closing a session leaves it open"""
+
+    def __init__(self, *args, cache: Optional[ResponseCache] = None, pool_timeout: float = POOL_TIMEOUT,
+                 **kwargs):
+        # Read by init_poolmanager(), which the base constructor calls
+        self.pool_timeout = pool_timeout
+        super().__init__(*args, **kwargs)
+        self.cache = cache
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _bounded_pool(HTTPConnectionPool, self.pool_timeout),
+            'https': _bounded_pool(HTTPSConnectionPool, self.pool_timeout),
+        }
+
+    def _send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.exceptions.ConnectionError(e, request=request)
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Send a request, or share the response of an identical one"""
+        key = self.cache.key(request, **kwargs) if self.cache is not None else None
+        if key is None:
+            return self._send(request, **kwargs)
+        # A caller waiting on an identical request gives up when its own request would have
+        timeout = wait_bound(kwargs.get('timeout'))
+        if timeout is not None:
+            timeout += self.pool_timeout
+        return self.cache.fetch(key, lambda: self._send(request, **kwargs), timeout)
+
+    def close(self) -> None:
+        """Ignored: the pool outlives the sessions using it"""
+
+    def shutdown(self) -> None:
+        """Close every pooled connection"""
+        super().close()
+
+
+class HTTPPool:
+    """Per-host keep-alive connection pool shared across scanner sessions"""
+
+    def __init__(self, connections_per_host: int = CONNECTIONS_PER_HOST, max_hosts: int = MAX_HOSTS,
+                 cache_bytes: int = CACHE_BYTES, pool_timeout: float = POOL_TIMEOUT):
+        """
+        Initialize the pool
+
+        Args:
+            connections_per_host: Connections open at once to one host
+            max_hosts: Hosts with pooled connections at once
+            cache_bytes: Memory for cached GET/HEAD responses (0 disables deduplication)
+            pool_timeout: Seconds a request waits for a free connection to its host
+        """
+        self.connections_per_host = connections_per_host
+        self.cache = ResponseCache(cache_bytes) if cache_bytes > 0 else None
+        self.adapter = SharedAdapter(
+            cache=self.cache,
+            pool_connections=max_hosts,
+            pool_maxsize=connections_per_host,
+            # Wait for a pooled connection rather than opening an extra one
+            pool_block=True,
+            pool_timeout=pool_timeout,
+        )
+
+    def session(self) -> requests.Session:
+        """
+        Create a session whose connections come from the pool
+
+        Cookies and headers stay private to the session; only the
+        connections are shared.
+        """
+        session = requests.Session()
+        session.mount('http://', self.adapter)
+        session.mount('https://', self.adapter)
+        return session
+
+    def close(self) -> None:
+        """Close every pooled connection"""
+        self.adapter.shutdown()
+
+
+_pool: Optional[HTTPPool] = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(connections_per_host: int = CONNECTIONS_PER_HOST, max_hosts: int = MAX_HOSTS,
+                   cache_bytes: int = CACHE_BYTES) -> HTTPPool:
+    """
+    Replace the process-wide pool, e.g. to match the number of scanner workers
+
+    Sessions created earlier keep using the previous pool.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+        _pool = HTTPPool(connections_per_host, max_hosts, cache_bytes)
+        return _pool
+
+
+def pooled_session() -> requests.Session:
+    """Create a session on the process-wide pool, creating the pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HTTPPool()
+        return _pool.session()
@@ -0,0 +1,162 @@
+"""
+Response cache for scanner sessions
+Identical GET and HEAD requests within a run go out once: callers that
+ask while the request is in flight wait for it, later callers get the
+stored response
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple, Union
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+# Memory held by cached response bodies
+CACHE_BYTES = 32 * 1024 * 1024
+# Larger bodies are shared with callers waiting on the request but not kept
+MAX_ENTRY_BYTES = 1024 * 1024
+# Only requests without side effects are deduplicated
+CACHEABLE_METHODS = ('GET', 'HEAD')
+# Request headers that do not change the response; all others must match
+IGNORED_HEADERS = frozenset({'connection', 'keep-alive'})
+
+
+def wait_bound(timeout: Union[None, float, Tuple[Optional[float], Optional[float]]]) -> Optional[float]:
+    """Seconds a request with this requests-style timeout may take to answer; None when unbounded"""
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return None if connect is None or read is None else connect + read
+    return timeout
+
+
+class _Flight:
+    """A request in progress, awaited by every caller asking for the same resource"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[requests.Response] = None
+        self.error: Optional[BaseException] = None
+
+
+def _copy_response(response: requests.Response) -> requests.Response:
+    """Independent Response over the same (already read) body"""
+    clone = requests.Response()
+    clone.status_code = response.status_code
+    clone.reason = response.reason
+    clone.headers = CaseInsensitiveDict(response.headers)
+    clone.url = response.url
+    clone.encoding = response.encoding
+    clone.elapsed = response.elapsed
+    clone.request = response.request
+    clone.connection = response.connection
+    # Kept so the session still picks up Set-Cookie; the connection is long released
+    clone.raw = response.raw
+    clone._content = response._content
+    clone._content_consumed = True
+    return clone
+
+
+class ResponseCache:
+    """Single-flight, memory-capped LRU cache of responses keyed by request"""
+
+    def __init__(self, max_bytes: int = CACHE_BYTES, max_entry_bytes: int = MAX_ENTRY_BYTES):
+        """
+        Initialize the cache
+
+        Args:
+            max_bytes: Total body bytes kept; least recently used responses go first
+            max_entry_bytes: Largest body kept
+        """
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = min(max_entry_bytes, max_bytes)
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[Tuple, requests.Response]' = OrderedDict()
+        self.flights: Dict[Tuple, _Flight] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(request: requests.PreparedRequest, stream: bool = False, verify=True,
+            cert=None, **kwargs) -> Optional[Tuple]:
+        """
+        Cache key for a request: method, URL and headers, plus the TLS options
+
+        Returns:
+            None when the request must always be sent
+        """
+        if request.method not in CACHEABLE_METHODS or request.body or stream:
+            return None
+        headers = tuple(sorted(
+            (name.lower(), value) for name, value in request.headers.items()
+            if name.lower() not in IGNORED_HEADERS
+        ))
+        return request.method, request.url, headers, str(verify), str(cert)
+
+    def fetch(self, key: Tuple, send: Callable[[], requests.Response],
+              timeout: Optional[float] = None) -> requests.Response:
+        """
+        Response for a key, sending the request only if nobody has or is
+
+        Errors are shared with the callers waiting on the request but never cached.
+
+        Args:
+            key: Cache key of the request
+            send: Sends the request
+            timeout: Seconds to wait for an identical request already in flight
+
+        Raises:
+            requests.exceptions.Timeout: If the request in flight takes longer than timeout
+        """
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return _copy_response(cached)
+            flight = self.flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self.flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if not leader:
+            if not flight.done.wait(timeout):
+                raise requests.exceptions.Timeout(f"Identical request still in flight after {timeout:g}s")
+            if flight.error is not None:
+                raise flight.error
+            return _copy_response(flight.response)
+
+        try:
+            response = send()
+            # Read the body now so it can be handed to every caller
+            response.content
+            flight.response = response
+            self._store(key, response)
+            return response
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.flights[key]
+            flight.done.set()
+
+    def _store(self, key: Tuple, response: requests.Response):
+        size = len(response._content or b'')
+        if size > self.max_entry_bytes:
+            return
+        with self.lock:
+            self.entries[key] = _copy_response(response)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted._content or b'')
+
+    def stats(self) -> Dict[str, int]:
+        """Requests answered without sending, requests sent, and bytes held"""
+        return {'hits': self.hits, 'misses': self.misses, 'bytes': self.size}
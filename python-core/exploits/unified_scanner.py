@@ -5,12 +5,20 @@ Aggregates all CVE scanners into a single CLI tool
 """
 
 import argparse
+import json
+import queue
 import sys
+import threading
+import time
+from concurrent.futures import Future, wait
 from pathlib import Path
-from typing import Dict, List
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import urlsplit
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-from shared import Theme, Signature, BannerDisplay
+sys.path.insert(0, str(Path(__file__).parent))
+from shared import Theme, Signature, BannerDisplay, HostScheduler, configure_pool, pooled_session
+from shared.http_pool import CONNECTIONS_PER_HOST, MAX_HOSTS
+from shared.response_cache import CACHE_BYTES
 
 # Import all scanner modules  
 from scanners.multi_cve_scanner import (
@@ -20,6 +28,7 @@ from scanners.multi_cve_scanner import (
 from scanners.extended_scanners import *
 from scanners.additional_scanners import *
 from scanners.file_leak_scanners import *
+from scanners.fingerprint import Fingerprint, fingerprint
 
 
 ALL_SCANNERS = {
@@ -78,6 +87,59 @@ ALL_SCANNERS = {
 }
 
 
+# Scanners running side by side against one target (across all targets with -l)
+DEFAULT_WORKERS = 10
+# Scanners running side by side against one host with -l
+PER_HOST_WORKERS = 4
+# Seconds a single scanner may run before its result is given up on
+SCAN_DEADLINE = 30.0
+# Seconds between checks on a scan that is still waiting for a worker
+QUEUE_POLL = 0.1
+
+
+class ScanPlan(NamedTuple):
+    """Scanners a target's fingerprint rules out"""
+    fingerprint: Fingerprint
+    # Scanner name -> message reported in place of its result
+    skipped: Dict[str, str]
+    # Requests the skipped scanners would have sent
+    requests_saved: int
+
+
+def plan_scans(target: str) -> ScanPlan:
+    """
+    Fingerprint a target and pick the scanners that do not apply to it
+    
+    Scanners without technology tags always run; tagged ones run only when
+    the target shows one of their technologies. Nothing is skipped when the
+    front page cannot be fetched.
+    """
+    url = target if target.startswith('http') else f"https://{target}"
+    seen = fingerprint(url, pooled_session())
+    skipped = {}
+    requests_saved = 0
+    if seen.complete:
+        for name, scanner_class in ALL_SCANNERS.items():
+            tags = scanner_class.technologies()
+            if tags and tags.isdisjoint(seen.tags):
+                skipped[name] = f"Skipped: no {' or '.join(sorted(tags))} fingerprint"
+                requests_saved += scanner_class.probe_count()
+    return ScanPlan(seen, skipped, requests_saved)
+
+
+def suppressed_findings(target: str, plan: ScanPlan) -> List[str]:
+    """
+    Skipped scanners that would have reported a finding, judging by the
+    responses the run fetched anyway: false positives the fingerprint avoided
+    """
+    suppressed = []
+    for name in plan.skipped:
+        result = ALL_SCANNERS[name](target).cached_scan()
+        if result is not None and result[0]:
+            suppressed.append(name)
+    return suppressed
+
+
 def run_single_scan(scanner_name: str, target: str) -> tuple:
     """Run a single scanner"""
     if scanner_name not in ALL_SCANNERS:
@@ -88,19 +150,205 @@ def run_single_scan(scanner_name: str, target: str) -> tuple:
     return scanner.scan()
 
 
-def run_all_scans(target: str) -> Dict[str, tuple]:
-    """Run all scanners against target"""
-    results = {}
+def run_all_scans(target: str, workers: int = DEFAULT_WORKERS, deadline: float = SCAN_DEADLINE,
+                  on_result: Callable[[str, tuple], None] = None,
+                  skip: Dict[str, str] = None) -> Dict[str, tuple]:
+    """
+    Run all scanners against target on a pool of worker threads
+    
+    Results come back in ALL_SCANNERS order whatever order the scans finish
+    in, so the output of two runs only differs where the findings do. A
+    scan that runs past its deadline is reported as timed out and its
+    worker is replaced; the thread cannot be killed, so it is left to
+    finish on its own and then exits. Workers are daemon threads and never
+    hold up the exit of the process.
+    
+    Args:
+        target: Target URL or host
+        workers: Scanners run concurrently
+        deadline: Seconds each scanner may run, counted from its own start
+        on_result: Called with (name, result) in ALL_SCANNERS order as soon as
+                   that result and every one before it are in
+        skip: Scanners not to run, each reported as (False, message)
+    """
+    skip = skip or {}
+    started = {}
+    # Overdue scans whose worker has been replaced
+    abandoned = set()
+    futures = {}
+    jobs = queue.Queue()
     for name, scanner_class in ALL_SCANNERS.items():
-        try:
-            scanner = scanner_class(target)
-            vulnerable, message = scanner.scan()
-            results[name] = (vulnerable, message)
-        except Exception as e:
-            results[name] = (False, f"Error: {str(e)}")
+        futures[name] = Future()
+        if name in skip:
+            started[name] = time.monotonic()
+            futures[name].set_result((False, skip[name]))
+        else:
+            jobs.put((name, scanner_class, futures[name]))
+    
+    def worker():
+        while True:
+            try:
+                name, scanner_class, future = jobs.get_nowait()
+            except queue.Empty:
+                return
+            started[name] = time.monotonic()
+            try:
+                future.set_result(scanner_class(target).scan())
+            except Exception as e:
+                future.set_exception(e)
+            if name in abandoned:
+                # A replacement worker took over this one's share of the queue
+                return
+    
+    def replace_overdue():
+        """Start a fresh worker for every scan stuck past its deadline"""
+        now = time.monotonic()
+        for name, start in list(started.items()):
+            if name not in abandoned and now - start > deadline and not futures[name].done():
+                abandoned.add(name)
+                threading.Thread(target=worker, daemon=True).start()
+    
+    for _ in range(min(workers, jobs.qsize())):
+        threading.Thread(target=worker, daemon=True).start()
+    
+    results = {}
+    for name, future in futures.items():
+        results[name] = _collect(name, future, started, deadline, replace_overdue)
+        if on_result is not None:
+            on_result(name, results[name])
     return results
 
 
+def _collect(name: str, future, started: Dict[str, float], deadline: float,
+             replace_overdue: Callable[[], None]) -> tuple:
+    """Wait for one scan's result until its deadline"""
+    # A scan still queued behind busy workers has not used any of its deadline;
+    # workers stuck on overdue scans are replaced so that it does get to start
+    while name not in started and not future.done():
+        replace_overdue()
+        wait([future], timeout=QUEUE_POLL)
+    try:
+        vulnerable, message = future.result(timeout=max(0.0, started[name] + deadline - time.monotonic()))
+        return vulnerable, message
+    except Exception as e:
+        if not future.done():
+            return False, f"Timed out after {deadline:g}s"
+        return False, f"Error: {str(e)}"
+
+
+class TargetScan:
+    """Progress of one target in a multi-target run"""
+    
+    def __init__(self, target: str, index: int):
+        self.target = target
+        self.index = index
+        url = target if target.startswith('http') else f"https://{target}"
+        # Targets on one host share its per-host cap whatever their scheme or port
+        self.host = urlsplit(url).hostname or target
+        self.plan: Optional[ScanPlan] = None
+        self.results: Dict[str, tuple] = {}
+
+
+def scan_targets(targets: Iterable[str], scanners: List[str], workers: int = DEFAULT_WORKERS,
+                 per_host: int = PER_HOST_WORKERS, deadline: float = SCAN_DEADLINE,
+                 use_fingerprint: bool = True,
+                 on_result: Callable[[TargetScan, str, tuple], None] = None,
+                 on_target: Callable[[TargetScan], None] = None) -> int:
+    """
+    Run scanners against a stream of targets as independent (target, scanner) jobs
+    
+    All jobs share one pool of workers, so a list of many targets takes
+    about as long as its total work divided by the workers, and no host
+    runs more than per_host of them at once. Targets are read from the
+    iterable as workers free up. With use_fingerprint each target is
+    fingerprinted first, as a job of its own, and only the scanners its
+    plan keeps are queued.
+    
+    Args:
+        targets: Target URLs or hosts
+        scanners: ALL_SCANNERS names to run against every target
+        workers: Scanners run concurrently across all targets
+        per_host: Scanners run concurrently against one host
+        deadline: Seconds each scanner may run, counted from its own start
+        on_result: Called with (target scan, name, result) as each scanner
+                   finishes; skipped scanners are not reported
+        on_target: Called with the target scan once all its results are in,
+                   ordered as in scanners
+    
+    Returns:
+        Number of targets scanned
+    """
+    scheduler = HostScheduler(workers, per_host, deadline)
+    counted = [0]
+    # Longest scans first, so a target is not left waiting on one long scan started last
+    by_cost = sorted(scanners, key=lambda name: -ALL_SCANNERS[name].probe_count())
+    
+    def numbered():
+        for index, target in enumerate(targets):
+            counted[0] = index + 1
+            yield TargetScan(target, index)
+    
+    def open_target(scan: TargetScan):
+        if use_fingerprint:
+            scheduler.submit(scan, scan.host, lambda: plan_scans(scan.target),
+                             lambda plan, error: queue_scanners(scan, plan))
+        else:
+            queue_scanners(scan, None)
+    
+    def queue_scanners(scan: TargetScan, plan: Optional[ScanPlan]):
+        # A fingerprint that failed or timed out prunes nothing
+        scan.plan = plan
+        skipped = plan.skipped if plan else {}
+        for name in by_cost:
+            if name in skipped:
+                scan.results[name] = (False, skipped[name])
+                continue
+            scheduler.submit(scan, scan.host, lambda name=name: ALL_SCANNERS[name](scan.target).scan(),
+                             lambda result, error, name=name: record(scan, name, result, error))
+    
+    def record(scan: TargetScan, name: str, result: tuple, error: Optional[BaseException]):
+        if isinstance(error, TimeoutError):
+            result = (False, str(error))
+        elif error is not None:
+            result = (False, f"Error: {str(error)}")
+        scan.results[name] = result
+        if on_result is not None:
+            on_result(scan, name, result)
+    
+    def close_target(scan: TargetScan):
+        scan.results = {name: scan.results[name] for name in scanners}
+        if on_target is not None:
+            on_target(scan)
+    
+    scheduler.run(numbered(), open_target, close_target)
+    return counted[0]
+
+
+def target_report(target: str, results: Dict[str, tuple], plan: Optional[ScanPlan],
+                  suppressed: List[str]) -> dict:
+    """JSON report of one target's results"""
+    skipped = plan.skipped if plan else {}
+    report = {
+        'target': target,
+        'results': [
+            {'scanner': name, 'vulnerable': vulnerable, 'message': message,
+             'skipped': name in skipped}
+            for name, (vulnerable, message) in results.items()
+        ],
+        'vulnerable': sum(1 for vulnerable, _ in results.values() if vulnerable),
+    }
+    if plan:
+        report['fingerprint'] = {
+            'technologies': sorted(plan.fingerprint.tags),
+            'complete': plan.fingerprint.complete,
+            'requests': plan.fingerprint.requests,
+            'skipped': len(skipped),
+            'requests_saved': plan.requests_saved,
+            'false_positives_avoided': suppressed,
+        }
+    return report
+
+
 def main():
     sig = Signature(
         tool_name="ReconX Unified Scanner",
@@ -108,12 +356,6 @@ def main():
         exploit_name="MegaScanner"
     )
     
-    display = BannerDisplay(sig)
-    display.show_header("""
-█▀▄▀█ ██▀ ▄▀  ▄▀▄   ▄▀▀ ▄▀▀ ▄▀▄ █▄ █ █▄ █ ██▀ █▀▄
-█ ▀ █ █▄▄ ▀▄█ █▀█   ▄██ ▀▄▄ █▀█ █ ▀█ █ ▀█ █▄▄ █▀▄
-    """)
-    
     parser = argparse.ArgumentParser(
         description='ReconX Unified Vulnerability Scanner - 37+ CVE Detectors',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -132,8 +374,8 @@ Examples:
   # Scan specific CVE
   scanner.py -t https://target.com -s CVE-2023-24044
   
-  # Scan multiple targets
-  scanner.py -l targets.txt --all
+  # Scan multiple targets, 50 scanners at a time, at most 4 per host
+  scanner.py -l targets.txt --all -w 50 --per-host 4
   
 {sig.get_footer()}
         """
@@ -144,43 +386,160 @@ Examples:
     parser.add_argument('-s', '--scanner', help='Specific scanner to run')
     parser.add_argument('-a', '--all', action='store_true', help='Run all scanners')
     parser.add_argument('--format', choices=['text', 'json'], default='text', help='Output format')
+    parser.add_argument('-w', '--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Scanners run concurrently with --all, across all targets with -l (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--per-host', type=int, default=PER_HOST_WORKERS,
+                        help=f'Scanners run concurrently against one host with -l (default: {PER_HOST_WORKERS})')
+    parser.add_argument('--deadline', type=float, default=SCAN_DEADLINE,
+                        help=f'Seconds each scanner may run before it is reported as timed out (default: {SCAN_DEADLINE:g})')
+    parser.add_argument('--connections', type=int, default=CONNECTIONS_PER_HOST,
+                        help=f'Keep-alive connections shared by all scanners, per host (default: {CONNECTIONS_PER_HOST})')
+    parser.add_argument('--response-cache', type=int, default=CACHE_BYTES // (1024 * 1024), metavar='MB',
+                        help='Memory for responses shared between scanners requesting the same URL, '
+                             '0 to send every request (default: %(default)s)')
+    parser.add_argument('--no-fingerprint', dest='fingerprint', action='store_false',
+                        help='Run every scanner with --all instead of skipping those for technologies '
+                             'the target does not show')
     
     args = parser.parse_args()
     
+    if args.workers < 1 or args.per_host < 1 or args.deadline <= 0 or args.connections < 1:
+        parser.error('--workers, --per-host, --deadline and --connections must be positive')
+    if args.response_cache < 0:
+        parser.error('--response-cache must not be negative')
+    # Every worker may be on a different host; keep a connection pool for each
+    configure_pool(connections_per_host=args.connections, max_hosts=max(MAX_HOSTS, args.workers),
+                   cache_bytes=args.response_cache * 1024 * 1024)
+    
+    # JSON output stays machine-readable: no banner, no colours
+    json_output = args.format == 'json'
+    if not json_output:
+        display = BannerDisplay(sig)
+        display.show_header("""
+█▀▄▀█ ██▀ ▄▀  ▄▀▄   ▄▀▀ ▄▀▀ ▄▀▄ █▄ █ █▄ █ ██▀ █▀▄
+█ ▀ █ █▄▄ ▀▄█ █▀█   ▄██ ▀▄▄ █▀█ █ ▀█ █ ▀█ █▄▄ █▀▄
+    """)
+    
     if not args.target and not args.list:
         parser.print_help()
         sys.exit(1)
     
-    targets = []
-    if args.target:
-        targets = [args.target]
-    elif args.list:
-        with open(args.list, 'r') as f:
-            targets = [line.strip() for line in f if line.strip()]
+    if not args.target:
+        scan_target_list(args, json_output)
+        return
     
+    targets = [args.target]
+    skipped = {}
+    
+    def print_result(name: str, result: tuple):
+        vulnerable, message = result
+        if name in skipped:
+            status = f"{Theme.DIM}[SKIPPED]"
+        else:
+            status = f"{Theme.FAIL}[VULNERABLE]" if vulnerable else f"{Theme.OKGREEN}[SAFE]"
+        print(f"{status} {name:30s} - {message}{Theme.ENDC}", flush=True)
+    
+    reports = []
     for target in targets:
-        print(f"\n{Theme.HEADER}{'='*60}{Theme.ENDC}")
-        print(f"{Theme.OKBLUE}Target: {target}{Theme.ENDC}")
-        print(f"{Theme.HEADER}{'='*60}{Theme.ENDC}\n")
+        if not json_output:
+            print(f"\n{Theme.HEADER}{'='*60}{Theme.ENDC}")
+            print(f"{Theme.OKBLUE}Target: {target}{Theme.ENDC}")
+            print(f"{Theme.HEADER}{'='*60}{Theme.ENDC}\n")
         
         if args.all:
-            results = run_all_scans(target)
-            vulnerable_count = sum(1 for v, _ in results.values() if v)
+            plan = plan_scans(target) if args.fingerprint else None
+            skipped = plan.skipped if plan else {}
+            if plan and not json_output:
+                technologies = ', '.join(sorted(plan.fingerprint.tags)) or 'nothing recognised'
+                if not plan.fingerprint.complete:
+                    technologies = 'front page unreachable, running every scanner'
+                print(f"{Theme.OKCYAN}Fingerprint: {technologies}{Theme.ENDC}\n")
             
-            for name, (vulnerable, message) in results.items():
-                status = f"{Theme.FAIL}[VULNERABLE]" if vulnerable else f"{Theme.OKGREEN}[SAFE]"
-                print(f"{status} {name:30s} - {message}{Theme.ENDC}")
+            # Text output streams each result as soon as everything before it is in
+            results = run_all_scans(target, workers=args.workers, deadline=args.deadline,
+                                    on_result=None if json_output else print_result, skip=skipped)
+            vulnerable_count = sum(1 for v, _ in results.values() if v)
+            suppressed = suppressed_findings(target, plan) if plan else []
             
-            print(f"\n{Theme.WARNING}Summary: {vulnerable_count}/{len(results)} potential vulnerabilities detected{Theme.ENDC}")
+            if json_output:
+                reports.append(target_report(target, results, plan, suppressed))
+            else:
+                print(f"\n{Theme.WARNING}Summary: {vulnerable_count}/{len(results) - len(skipped)} potential vulnerabilities detected{Theme.ENDC}")
+                if plan:
+                    print(f"{Theme.OKCYAN}Fingerprint: {len(skipped)} scanners skipped, "
+                          f"{plan.requests_saved} requests saved for {plan.fingerprint.requests} spent, "
+                          f"{len(suppressed)} likely false positives avoided"
+                          f"{' (' + ', '.join(suppressed) + ')' if suppressed else ''}{Theme.ENDC}")
             
         elif args.scanner:
             vulnerable, message = run_single_scan(args.scanner, target)
+            if json_output:
+                print(json.dumps({'target': target, 'scanner': args.scanner,
+                                  'vulnerable': vulnerable, 'message': message}, indent=2))
+                sys.exit(1 if vulnerable else 0)
             if vulnerable:
                 print(f"{Theme.FAIL}[VULNERABLE] {message}{Theme.ENDC}")
                 sys.exit(1)
             else:
                 print(f"{Theme.OKGREEN}[SAFE] {message}{Theme.ENDC}")
                 sys.exit(0)
+    
+    if json_output and reports:
+        print(json.dumps(reports, indent=2))
+
+
+def scan_target_list(args, json_output: bool):
+    """Run -l: every (target, scanner) job on one scheduler, results printed as they finish"""
+    if not args.all and not args.scanner:
+        print(f"{Theme.FAIL}[!] -l needs --all or -s{Theme.ENDC}")
+        sys.exit(1)
+    if args.scanner and not args.all and args.scanner not in ALL_SCANNERS:
+        print(f"{Theme.FAIL}[!] Scanner '{args.scanner}' not found{Theme.ENDC}")
+        sys.exit(1)
+    scanners = list(ALL_SCANNERS) if args.all else [args.scanner]
+    
+    output_lock = threading.Lock()
+    reports = []
+    totals = {'targets': 0, 'vulnerable': 0}
+    
+    def print_result(scan: TargetScan, name: str, result: tuple):
+        if json_output:
+            return
+        vulnerable, message = result
+        status = f"{Theme.FAIL}[VULNERABLE]" if vulnerable else f"{Theme.OKGREEN}[SAFE]"
+        with output_lock:
+            print(f"{status} {scan.target:30s} {name:30s} - {message}{Theme.ENDC}", flush=True)
+    
+    def finish_target(scan: TargetScan):
+        suppressed = suppressed_findings(scan.target, scan.plan) if scan.plan else []
+        report = target_report(scan.target, scan.results, scan.plan, suppressed)
+        with output_lock:
+            totals['targets'] += 1
+            totals['vulnerable'] += report['vulnerable']
+            if json_output:
+                reports.append((scan.index, report))
+                return
+            ran = len(scan.results) - (len(scan.plan.skipped) if scan.plan else 0)
+            line = f"Summary for {scan.target}: {report['vulnerable']}/{ran} potential vulnerabilities detected"
+            if scan.plan:
+                technologies = ', '.join(sorted(scan.plan.fingerprint.tags)) or 'nothing recognised'
+                line += (f" (fingerprint: {technologies}; {len(scan.plan.skipped)} skipped, "
+                         f"{len(suppressed)} likely false positives avoided)")
+            print(f"{Theme.WARNING}{line}{Theme.ENDC}", flush=True)
+    
+    with open(args.list, 'r') as f:
+        scan_targets((line.strip() for line in f if line.strip()), scanners,
+                     workers=args.workers, per_host=args.per_host, deadline=args.deadline,
+                     use_fingerprint=args.all and args.fingerprint,
+                     on_result=print_result, on_target=finish_target)
+    
+    if json_output:
+        print(json.dumps([report for _, report in sorted(reports, key=lambda item: item[0])], indent=2))
+    else:
+        print(f"\n{Theme.WARNING}Scanned {totals['targets']} targets: "
+              f"{totals['vulnerable']} potential vulnerabilities detected{Theme.ENDC}")
+    if args.scanner and not args.all:
+        sys.exit(1 if totals['vulnerable'] else 0)
 
 
 if __name__ == "__main__":
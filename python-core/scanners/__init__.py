@@ -3,6 +3,7 @@ Scanners package - Subdomain enumeration and port scanning tools
 """
 
 from .subdomain_enum import enumerate_subdomains
-from .port_scanner import scan_ports
+from .port_scanner import scan_ports, scan_targets
+from .recon_pipeline import run_recon
 
-__all__ = ['enumerate_subdomains', 'scan_ports']
+__all__ = ['enumerate_subdomains', 'scan_ports', 'scan_targets', 'run_recon']
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+DNS Answer Cache
+Persists resolved answers, negative ones included, in SQLite keyed by
+(name, record type) until their TTL expires, so repeated scans of the
+same domain only re-query what went stale
+"""
+
+import os
+import json
+import time
+import sqlite3
+from typing import List, Optional, Tuple
+
+try:
+    from .resolver_pool import STATUS_ERROR, Answer
+except ImportError:
+    from resolver_pool import STATUS_ERROR, Answer
+
+# Default cache file, overridable through the environment
+DEFAULT_CACHE_PATH = os.environ.get(
+    'RECONX_DNS_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'reconx', 'dns_cache.sqlite3')
+)
+# TTL bounds (seconds); negative answers without an SOA get the minimum
+MIN_TTL = 60
+MAX_TTL = 86400
+# Pending writes committed together
+WRITE_BATCH = 500
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS answers (
+    name TEXT NOT NULL,
+    rtype TEXT NOT NULL,
+    status TEXT NOT NULL,
+    records TEXT NOT NULL,
+    ttl INTEGER NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (name, rtype)
+) WITHOUT ROWID
+'''
+
+class AnswerCache:
+    """
+    SQLite-backed answer cache shared by every scan using the same file
+
+    Reads go straight to the indexed table; writes are buffered and
+    committed in batches. WAL mode lets concurrent scans share the file.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, refresh: bool = False):
+        """
+        Args:
+            path: SQLite file, created with its directory if missing
+            refresh: Ignore cached answers (fresh answers are still stored)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.refresh = refresh
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute(SCHEMA)
+        # Drop what expired long ago so the file does not grow without bound
+        self.db.execute('DELETE FROM answers WHERE expires < ?', (time.time() - MAX_TTL,))
+        self.db.commit()
+        self.pending: List[Tuple] = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, rtype: str) -> Optional[Answer]:
+        """Fresh cached answer, or None when missing, stale or refreshing"""
+        if self.refresh:
+            return None
+        row = self.db.execute(
+            'SELECT status, records, ttl, expires FROM answers WHERE name = ? AND rtype = ?',
+            (name, rtype)
+        ).fetchone()
+        now = time.time()
+        if row is None or row[3] <= now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        status, records, _, expires = row
+        return Answer(status, json.loads(records), int(expires - now))
+
+    def put(self, name: str, rtype: str, answer: Answer):
+        """Store an answer until its TTL runs out; failed lookups are not cached"""
+        if answer.status == STATUS_ERROR:
+            return
+        ttl = min(MAX_TTL, max(MIN_TTL, answer.ttl))
+        self.pending.append((name, rtype, answer.status, json.dumps(answer.records), ttl, time.time() + ttl))
+        if len(self.pending) >= WRITE_BATCH:
+            self.flush()
+
+    def flush(self):
+        """Commit buffered writes"""
+        if not self.pending:
+            return
+        self.db.executemany('INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)', self.pending)
+        self.db.commit()
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    def stats(self) -> dict:
+        return {'path': self.path, 'hits': self.hits, 'misses': self.misses}
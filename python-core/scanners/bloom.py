@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Bloom Filter
+Fixed-memory set membership for deduplicating millions of names; a
+false positive skips a name, a false negative never happens
+"""
+
+import math
+import hashlib
+
+# Fraction of unseen names wrongly reported as seen at full capacity
+DEFAULT_ERROR_RATE = 0.001
+
+class BloomFilter:
+    """Bit array with k hash positions per item, derived by double hashing one digest"""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        capacity = max(1, capacity)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def false_positive_rate(self) -> float:
+        """Estimated chance that an unseen item is reported as seen, at the current fill"""
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def __len__(self) -> int:
+        """Items added (duplicates and false positives excluded)"""
+        return self.count
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        # Odd step, so the positions never collapse onto one bit
+        step = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.hashes):
+            yield (first + i * step) % self.size
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item: str) -> bool:
+        """Add an item; returns False when it was (probably) already present"""
+        added = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Scan Checkpoint
+Records the progress of a port sweep so an interrupted scan can resume
+where it stopped: the completed hosts, a bitmap of probed ports for each
+address still in flight, and the open ports found so far
+
+Completed hosts are kept as a watermark below which every host is done
+plus the few finished ahead of it, so the file stays small for target
+lists of any size (an IPv6 /64 included).
+"""
+
+import os
+import json
+import zlib
+import base64
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+try:
+    from .port_spec import PortSet
+except ImportError:
+    from port_spec import PortSet
+
+CHECKPOINT_VERSION = 2
+# Seconds between periodic checkpoint writes
+CHECKPOINT_INTERVAL = 30.0
+
+def _pack(data: bytes) -> str:
+    """Compress a bitmap into a JSON-safe string"""
+    return base64.b64encode(zlib.compress(bytes(data))).decode('ascii')
+
+def _unpack(text: str) -> bytes:
+    """Inverse of _pack"""
+    return zlib.decompress(base64.b64decode(text))
+
+class ScanCheckpoint:
+    """
+    Progress of one scan, keyed by each host's position in the expanded target list
+
+    Hosts are identified by index rather than name, so the same target
+    listed twice (or inside overlapping CIDR blocks) is tracked per entry.
+    """
+
+    def __init__(self, path: str, targets: List[str], ports: Iterable[int], total_hosts: int):
+        self.path = path
+        self.targets = list(targets)
+        self.ports = self._port_set(ports)
+        self.total_hosts = total_hosts
+        # Every host below done_below is complete, and so are those in done_ahead
+        self.done_below = 0
+        self.done_ahead: Set[int] = set()
+        # host index -> (target, {ip: PortSet of probed ports})
+        self.partial: Dict[int, tuple] = {}
+        # (target, ip, port) -> open port record
+        self.open: Dict[tuple, dict] = {}
+        # Ports the liveness check may probe, kept so a resumed scan honours the original exclusions
+        self.liveness_ports: Optional[List[int]] = None
+        self.resumed = False
+
+    @staticmethod
+    def _port_set(ports: Iterable[int]) -> PortSet:
+        if isinstance(ports, PortSet):
+            return ports
+        port_set = PortSet()
+        for port in ports:
+            port_set.add(port)
+        return port_set
+
+    @classmethod
+    def load(cls, path: str) -> 'ScanCheckpoint':
+        """
+        Read a checkpoint file
+
+        Raises:
+            OSError: If the file cannot be read
+            ValueError: If the file is not a checkpoint this version understands
+        """
+        with open(path, 'r') as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Corrupt checkpoint {path}: {e}")
+
+        if not isinstance(data, dict) or data.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint format: {path}")
+
+        try:
+            checkpoint = cls(path, data['targets'], PortSet.from_bytes(_unpack(data['ports'])),
+                             data['total_hosts'])
+            checkpoint.done_below = int(data['done_below'])
+            checkpoint.done_ahead = {int(index) for index in data['done_ahead']}
+            for index, host in data['partial'].items():
+                checkpoint.partial[int(index)] = (host['target'], {
+                    ip: PortSet.from_bytes(_unpack(bitmap)) for ip, bitmap in host['ports'].items()
+                })
+            for record in data['open']:
+                checkpoint.open[(record['subdomain'], record.get('ip'), record['port'])] = record
+            checkpoint.liveness_ports = data.get('liveness_ports')
+        except (KeyError, TypeError, ValueError, zlib.error) as e:
+            raise ValueError(f"Corrupt checkpoint {path}: {e}")
+
+        if not 0 <= checkpoint.done_below <= checkpoint.total_hosts or any(
+                not checkpoint.done_below < index < checkpoint.total_hosts for index in checkpoint.done_ahead):
+            raise ValueError(f"Corrupt checkpoint {path}: completed hosts out of range")
+        checkpoint.resumed = True
+        return checkpoint
+
+    @classmethod
+    def open_or_create(cls, path: str, targets: List[str], ports: Iterable[int],
+                       total_hosts: int) -> 'ScanCheckpoint':
+        """
+        Continue the checkpoint at path, or start a new one when there is none
+
+        Raises:
+            ValueError: If the existing checkpoint belongs to a different scan
+        """
+        checkpoint = cls(path, targets, ports, total_hosts)
+        if not os.path.exists(path):
+            return checkpoint
+
+        existing = cls.load(path)
+        if existing.targets != checkpoint.targets or existing.ports.bitmap != checkpoint.ports.bitmap:
+            raise ValueError(f"Checkpoint {path} was written for different targets or ports")
+        return existing
+
+    def host_done(self, index: int) -> bool:
+        """Whether the host at index was fully scanned before"""
+        return index < self.done_below or index in self.done_ahead
+
+    def done_ports(self, index: int, ip: str) -> Optional[PortSet]:
+        """Ports of an address already probed, or None when none were"""
+        host = self.partial.get(index)
+        return host[1].get(ip) if host is not None else None
+
+    def mark_port(self, index: int, target: str, ip: str, port: int):
+        """Record that one port of an address has been probed"""
+        host = self.partial.get(index)
+        if host is None:
+            host = self.partial[index] = (target, {})
+        done = host[1].get(ip)
+        if done is None:
+            done = host[1][ip] = PortSet()
+        done.add(port)
+
+    def finish_host(self, index: int):
+        """Record a host as complete; its port bitmaps are no longer needed"""
+        if index == self.done_below:
+            self.done_below += 1
+            while self.done_below in self.done_ahead:
+                self.done_ahead.remove(self.done_below)
+                self.done_below += 1
+        elif index > self.done_below:
+            self.done_ahead.add(index)
+        self.partial.pop(index, None)
+
+    def add_open(self, record: dict):
+        """Record an open port event (later records for the same port replace earlier ones)"""
+        self.open[(record['subdomain'], record.get('ip'), record['port'])] = record
+
+    def open_ports(self) -> List[dict]:
+        """Open port records found so far"""
+        return list(self.open.values())
+
+    def save(self):
+        """Write the checkpoint atomically, so an interruption mid-write keeps the previous one"""
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'saved_at': datetime.now().isoformat(),
+            'targets': self.targets,
+            'ports': _pack(self.ports.bitmap),
+            'total_hosts': self.total_hosts,
+            'done_below': self.done_below,
+            'done_ahead': sorted(self.done_ahead),
+            'partial': {
+                str(index): {
+                    'target': target,
+                    'ports': {ip: _pack(done.bitmap) for ip, done in ports.items()},
+                }
+                for index, (target, ports) in self.partial.items()
+            },
+            'open': self.open_ports(),
+            'liveness_ports': self.liveness_ports,
+        }
+
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+DNS Cache
+Resolves each hostname once and caches its A and AAAA answers until
+their TTL expires, so scanners connect straight to the resolved IPs
+"""
+
+import socket
+import threading
+import time
+import ipaddress
+from typing import Dict, List, Tuple
+
+try:
+    import dns.resolver
+    import dns.exception
+except ImportError:
+    # dnspython is optional here; without it answers come from the system
+    # resolver and are cached for DEFAULT_TTL
+    dns = None
+
+# Seconds to cache answers when the resolver gives no TTL (system resolver)
+DEFAULT_TTL = 300
+# Seconds to remember that a name did not resolve
+NEGATIVE_TTL = 60
+
+# (address family, IP) as accepted by socket.socket() and connect()
+Address = Tuple[int, str]
+
+class DnsCache:
+    """Thread-safe cache of resolved addresses with TTL-aware expiry"""
+
+    def __init__(self, default_ttl: int = DEFAULT_TTL, negative_ttl: int = NEGATIVE_TTL,
+                 lifetime: float = 5.0):
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.lifetime = lifetime
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Tuple[float, List[Address]]] = {}
+
+    def resolve(self, host: str) -> List[Address]:
+        """
+        Resolve a hostname to its A and AAAA addresses
+
+        IP literals are returned as-is without touching the cache.
+
+        Returns:
+            [(family, ip), ...] IPv4 first; empty when the name does not resolve
+        """
+        try:
+            literal = ipaddress.ip_address(host)
+            family = socket.AF_INET if literal.version == 4 else socket.AF_INET6
+            return [(family, str(literal))]
+        except ValueError:
+            pass
+
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(host)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        addresses, ttl = self._lookup(host)
+        if not addresses:
+            ttl = self.negative_ttl
+        with self.lock:
+            self.entries[host] = (now + ttl, addresses)
+        return addresses
+
+    def _lookup(self, host: str) -> Tuple[List[Address], int]:
+        """Query A and AAAA records, falling back to the system resolver (hosts file)"""
+        if dns is not None:
+            addresses = []
+            ttls = []
+            for rtype, family in (('A', socket.AF_INET), ('AAAA', socket.AF_INET6)):
+                try:
+                    answer = dns.resolver.resolve(host, rtype, lifetime=self.lifetime)
+                except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer,
+                        dns.resolver.NoNameservers, dns.exception.Timeout):
+                    continue
+                except dns.exception.DNSException:
+                    # Malformed name (empty or overlong label): it can never resolve
+                    return [], self.negative_ttl
+                addresses.extend((family, str(rdata)) for rdata in answer)
+                ttls.append(answer.rrset.ttl)
+            if addresses:
+                return addresses, min(ttls)
+
+        return self._system_lookup(host), self.default_ttl
+
+    def _system_lookup(self, host: str) -> List[Address]:
+        """Resolve through getaddrinfo, which also honours /etc/hosts"""
+        try:
+            infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+        except (socket.gaierror, UnicodeError):
+            return []
+
+        addresses = []
+        for family, _, _, _, sockaddr in infos:
+            address = (family, sockaddr[0])
+            if family in (socket.AF_INET, socket.AF_INET6) and address not in addresses:
+                addresses.append(address)
+        addresses.sort(key=lambda address: address[0] != socket.AF_INET)
+        return addresses
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Event Writer
+Buffered JSON-lines output for the scanners: workers hand events to a
+queue and a background thread serializes them and writes whole lines in
+batches, so no worker waits on a lock or a flush
+"""
+
+import sys
+import json
+import time
+import queue
+import atexit
+import threading
+from typing import Optional, TextIO
+
+# Longest an event waits in the buffer before it is written (seconds)
+FLUSH_INTERVAL = 0.05
+# Events per batch; a full batch is written without waiting for the interval
+FLUSH_EVENTS = 256
+
+class _Flush:
+    """Marker queued by flush(); set once every event before it is written"""
+
+    def __init__(self):
+        self.done = threading.Event()
+
+_CLOSE = object()
+
+class EventWriter:
+    """
+    Coalesces events into batched writes on a background thread
+
+    Events are written in the order they were emitted; each batch goes out
+    as one write of complete lines followed by a single flush.
+    """
+
+    def __init__(self, stream: Optional[TextIO] = None, interval: float = FLUSH_INTERVAL,
+                 max_events: int = FLUSH_EVENTS):
+        self.stream = stream
+        self.interval = interval
+        self.max_events = max_events
+        self.queue = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _start(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='event-writer', daemon=True)
+                self.thread.start()
+                atexit.register(self.close)
+
+    def emit(self, event: dict):
+        """Queue an event; serialization and I/O happen on the writer thread"""
+        if self.thread is None:
+            self._start()
+        self.queue.put(event)
+
+    def flush(self):
+        """Block until every event emitted so far has been written"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        marker = _Flush()
+        self.queue.put(marker)
+        marker.done.wait()
+
+    def close(self):
+        """Write everything still buffered and stop the writer thread"""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        self.queue.put(_CLOSE)
+        self.thread.join()
+
+    def _run(self):
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_events and not isinstance(batch[-1], _Flush) and batch[-1] is not _CLOSE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            lines = []
+            markers = []
+            for item in batch:
+                if item is _CLOSE:
+                    closing = True
+                elif isinstance(item, _Flush):
+                    markers.append(item)
+                else:
+                    lines.append(json.dumps(item) + '\n')
+            self._write(''.join(lines))
+            for marker in markers:
+                marker.done.set()
+
+    def _write(self, text: str):
+        if not text:
+            return
+        stream = self.stream or sys.stdout
+        try:
+            stream.write(text)
+            stream.flush()
+        except (BrokenPipeError, ValueError):
+            # Reader went away or stdout was closed; drop the output
+            pass
+
+# Shared writer for stdout, used by the scanners' output_* functions
+events = EventWriter()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Subdomain Permutations
+Derives new candidate labels from names already found: environment
+prefixes and suffixes (dev-api, api-staging), deeper levels (staging.api),
+word swaps (dev-api -> qa-api) and numeric increments (api2 -> api3)
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+# Words commonly combined with existing labels
+PERMUTATION_WORDS = [
+    'dev', 'staging', 'stage', 'test', 'qa', 'uat', 'prod', 'api', 'admin', 'internal',
+    'beta', 'old', 'new', 'v1', 'v2', 'app', 'web', 'cdn', 'mail', 'vpn',
+]
+
+# Candidates generated per found name, before deduplication
+PERMUTATIONS_PER_NAME = 200
+# Candidates resolved per enumeration, across all rounds
+DEFAULT_BUDGET = 5000
+# Rounds of permuting names found by the previous round
+DEFAULT_DEPTH = 1
+# How far numeric suffixes are counted up and down
+NUMBER_SPREAD = 3
+
+TRAILING_NUMBER = re.compile(r'^(.*?)(\d+)$')
+
+def _numbers(label: str) -> Iterator[str]:
+    """api2 -> api1, api3, api4, api5; api -> api1, api2"""
+    match = TRAILING_NUMBER.match(label)
+    if not match:
+        yield f"{label}1"
+        yield f"{label}2"
+        return
+    stem, digits = match.groups()
+    value = int(digits)
+    for number in range(max(0, value - NUMBER_SPREAD), value + NUMBER_SPREAD + 1):
+        if number != value:
+            # Keep zero padding: web01 -> web02
+            yield f"{stem}{number:0{len(digits)}d}"
+
+def permute_label(label: str, words: List[str] = PERMUTATION_WORDS) -> Iterator[str]:
+    """
+    Candidate labels derived from one found label (relative to the apex domain)
+
+    Only the leftmost label is varied; deeper levels are kept as-is, so
+    dev.api yields staging.api and dev-2.api but never touches api.
+    """
+    first, dot, rest = label.partition('.')
+    suffix = dot + rest
+
+    yield from (candidate + suffix for candidate in _numbers(first))
+
+    parts = first.split('-')
+    for index, part in enumerate(parts):
+        if part in words:
+            for word in words:
+                if word != part:
+                    yield '-'.join(parts[:index] + [word] + parts[index + 1:]) + suffix
+
+    for word in words:
+        if word in parts:
+            continue
+        yield f"{word}-{first}{suffix}"
+        yield f"{first}-{word}{suffix}"
+        yield f"{word}.{label}"
+
+def permute_labels(labels: Iterable[str], words: List[str] = PERMUTATION_WORDS,
+                   per_name: int = PERMUTATIONS_PER_NAME) -> Iterator[str]:
+    """Candidates for many found labels, at most `per_name` each (duplicates included)"""
+    for label in labels:
+        for count, candidate in enumerate(permute_label(label, words)):
+            if count >= per_name:
+                break
+            # DNS caps each label at 63 bytes
+            if candidate != label and len(candidate.partition('.')[0]) <= 63:
+                yield candidate
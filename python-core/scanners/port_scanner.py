@@ -1,31 +1,41 @@
 #!/usr/bin/env python3
 """
 Port Scanner
-Multi-threaded port scanner with service detection
+Multi-threaded or asyncio port scanner with service detection
 Outputs results as JSON lines to stdout for real-time processing
 """
 
+import re
 import sys
 import json
+import time
+import errno
+import signal
 import socket
+import asyncio
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Tuple
-from queue import Queue
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
 import argparse
 
-# Common ports to scan (top 100 most common)
-COMMON_PORTS = [
-    20, 21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 445, 993, 995,
-    1723, 3306, 3389, 5900, 8080, 8443, 8888, 9090, 27017, 5432, 6379, 11211,
-    1521, 2375, 2376, 2377, 3000, 3001, 3128
-
-, 4444, 5000, 5001, 5432, 5672,
-    5984, 6000, 6001, 6379, 7000, 7001, 7547, 8000, 8001, 8008, 8009, 8010,
-    8081, 8082, 8089, 8090, 8091, 8100, 8161, 8200, 8300, 8400, 8500, 8600,
-    8888, 9000, 9001, 9009, 9090, 9091, 9092, 9093, 9094, 9095, 9096, 9097,
-    9100, 9200, 9300, 9999, 10000, 10001, 27015, 27016, 27017, 50070
-]
+try:
+    from .port_spec import TOP100_PORTS, PortSet, parse_port_exclusions, parse_port_spec
+    from .target_spec import count_targets, expand_targets, validate_targets
+    from .dns_cache import DnsCache
+    from .checkpoint import CHECKPOINT_INTERVAL, ScanCheckpoint
+    from .event_writer import events
+except ImportError:
+    # Running as a script rather than as part of the scanners package
+    from port_spec import TOP100_PORTS, PortSet, parse_port_exclusions, parse_port_spec
+    from target_spec import count_targets, expand_targets, validate_targets
+    from dns_cache import DnsCache
+    from checkpoint import CHECKPOINT_INTERVAL, ScanCheckpoint
+    from event_writer import events
+
+# Common ports to scan (deduplicated top 100 list)
+COMMON_PORTS = list(TOP100_PORTS)
 
 # Service identification by port
 PORT_SERVICES = {
@@ -40,15 +50,79 @@ PORT_SERVICES = {
 }
 
 NUM_THREADS = 50
-scan_queue = Queue()
-results_lock = threading.Lock()
+# Default number of in-flight connects for the asyncio engine
+ASYNC_CONCURRENCY = 1000
+ENGINES = ('thread', 'async')
+# Maximum hosts scanned side by side; further targets wait their turn
+HOST_GROUP = 256
+
+# Which resolved addresses of a host are swept:
+#   first      - the first address that passes the liveness check (IPv4 preferred)
+#   per-family - the first live address of each family (IPv4 and IPv6)
+#   all        - every resolved address
+ADDRESS_POLICIES = ('first', 'per-family', 'all')
+
+# Connect timeouts (seconds); the adaptive estimator starts at the initial
+# value and moves between the floor and the ceiling as RTT samples arrive
+INITIAL_TIMEOUT = 1.0
+MIN_TIMEOUT = 0.1
+MAX_TIMEOUT = 3.0
 
-def output_progress(percent: int):
-    """Output progress update"""
-    with results_lock:
-        print(json.dumps({'type': 'progress', 'percent': percent}), flush=True)
+# Probe outcomes: open answered SYN/ACK, closed answered RST, filtered said nothing
+STATE_OPEN = 'open'
+STATE_CLOSED = 'closed'
+STATE_FILTERED = 'filtered'
 
-def output_port(subdomain: str, port: int, state: str, service: str):
+# High-likelihood ports probed before a sweep to decide whether a host is up
+LIVENESS_PORTS = (80, 443, 22)
+
+# Banner grabbing on open ports
+BANNER_TIMEOUT = 2.0
+BANNER_BYTES = 1024
+BANNER_CONCURRENCY = 100
+BANNER_TEXT_LIMIT = 200
+
+# Sent when a service stays silent after connect; keyed by PORT_SERVICES name
+DEFAULT_BANNER_PROBE = b'HEAD / HTTP/1.0\r\n\r\n'
+BANNER_PROBES = {
+    'redis': b'PING\r\n',
+}
+
+# Banner signatures, checked in order; a 'product' group names the software.
+# A None service keeps the port's PORT_SERVICES name (e.g. TLS on 8443).
+SERVICE_SIGNATURES = [
+    (service, re.compile(pattern, re.IGNORECASE | re.DOTALL))
+    for service, pattern in (
+        ('ssh', rb'^SSH-[\d.]+-(?P<product>[^\r\n]+)'),
+        ('https', rb'^HTTP/\d(?:\.\d)? 400.*plain HTTP request was sent to HTTPS port'),
+        ('http', rb'^HTTP/\d(?:\.\d)? \d{3}.*?\r?\nServer:[ \t]*(?P<product>[^\r\n]+)'),
+        ('http', rb'^HTTP/\d(?:\.\d)? \d{3}'),
+        ('redis', rb'^(?:-NOAUTH|-DENIED|\+PONG|-ERR operation not permitted)'),
+        ('ftp', rb'^220[ -](?P<product>[^\r\n]*FTP[^\r\n]*)'),
+        ('smtp', rb'^220[ -](?P<product>[^\r\n]*(?:SMTP|Postfix|Exim|Sendmail)[^\r\n]*)'),
+        ('pop3', rb'^\+OK'),
+        ('imap', rb'^\* OK'),
+        ('mysql', rb'^.{4}\x0a(?P<product>[\d.]+[\w.-]*)\x00'),
+        ('vnc', rb'^RFB (?P<product>\d{3}\.\d{3})'),
+        ('amqp', rb'^AMQP'),
+        ('telnet', rb'^\xff[\xfb-\xfe]'),
+        (None, rb'^\x15\x03[\x00-\x04]'),
+    )
+]
+
+# Minimum seconds between progress events for the same host (and overall);
+# a host's completion is always reported
+PROGRESS_INTERVAL = 0.5
+
+def output_progress(percent: int, subdomain: str = None):
+    """Output progress update, overall or for a single host"""
+    event = {'type': 'progress', 'percent': percent}
+    if subdomain is not None:
+        event['subdomain'] = subdomain
+    events.emit(event)
+
+def output_port(subdomain: str, port: int, state: str, service: str,
+                banner: str = None, product: str = None, ip: str = None):
     """Output port scan result"""
     result = {
         'type': 'port',
@@ -58,119 +132,996 @@ def output_port(subdomain: str, port: int, state: str, service: str):
         'state': state,
         'discovered_at': datetime.now().isoformat()
     }
-    with results_lock:
-        print(json.dumps(result), flush=True)
+    if ip is not None:
+        result['ip'] = ip
+    if banner is not None:
+        result['banner'] = banner
+    if product is not None:
+        result['product'] = product
+    events.emit(result)
+
+def open_record(subdomain: str, port: int, service: str, ip: str = None,
+                banner: str = None, product: str = None) -> dict:
+    """output_port() arguments for an open port, as kept in a scan checkpoint"""
+    record = {'subdomain': subdomain, 'port': port, 'state': 'open', 'service': service}
+    if ip is not None:
+        record['ip'] = ip
+    if banner is not None:
+        record['banner'] = banner
+    if product is not None:
+        record['product'] = product
+    return record
 
 def output_error(message: str):
     """Output error message"""
-    with results_lock:
-        print(json.dumps({'type': 'error', 'message': message}), flush=True, file=sys.stderr)
+    # Keep errors after the events that preceded them
+    events.flush()
+    print(json.dumps({'type': 'error', 'message': message}), flush=True, file=sys.stderr)
 
-def scan_port(target: str, port: int, timeout: float = 1.0) -> Tuple[bool, str]:
+def output_host(subdomain: str, state: str, **details):
+    """Output a host-level decision (liveness, skipped sweeps)"""
+    event = {'type': 'host', 'subdomain': subdomain, 'state': state}
+    event.update(details)
+    events.emit(event)
+
+class ScanProgress:
     """
-    Scan a single port
+    Tracks scanned ports per host and overall, emitting progress events
+    
+    Overall progress is counted in hosts: each host is worth an equal share
+    of the known host total, split across its planned probes. It can be
+    reported without enumerating the targets first.
+    
+    Events are throttled by time rather than probe count, so their rate
+    stays flat however fast the sweep runs.
+    """
+    
+    def __init__(self, total_hosts: int, interval: float = PROGRESS_INTERVAL):
+        self.total_hosts = max(1, total_hosts)
+        self.interval = interval
+        self.completed = 0.0
+        self.reported = 0
+        self.reported_at = 0.0
+    
+    def update(self, host: 'HostState') -> bool:
+        """Record one finished probe against `host`; returns True once the host is done"""
+        host.scanned += 1
+        done, total = host.scanned, host.total
+        self.completed += 1 / total
+        
+        now = time.monotonic()
+        if done == total:
+            output_progress(100, host.target)
+        elif now - host.reported_at >= self.interval:
+            host.reported_at = now
+            output_progress(int(done / total * 100), host.target)
+        
+        self.report(now)
+        return done == total
+    
+    def finish_host(self, target: str = None):
+        """Count a host that needs no (more) probes as complete"""
+        if target is not None:
+            output_progress(100, target)
+        self.completed += 1
+        self.report()
+    
+    def report(self, now: float = None):
+        """Emit overall progress when the whole percentage changed, at most once per interval"""
+        now = time.monotonic() if now is None else now
+        if now - self.reported_at < self.interval:
+            return
+        percent = min(100, int(self.completed / self.total_hosts * 100))
+        if percent != self.reported:
+            self.reported = percent
+            self.reported_at = now
+            output_progress(percent)
+
+class HostState:
+    """
+    A host in the scan window: the addresses being swept, one RTT estimator
+    per address, and the rest of its sweep as (address, port) jobs
+    """
+    
+    def __init__(self, index: int, target: str):
+        self.index = index
+        self.target = target
+        self.addresses = []
+        self.estimators = {}
+        self.ports = iter(())
+        self.total = 0
+        self.scanned = 0
+        self.reported_at = time.monotonic()
+
+class RttEstimator:
+    """
+    Per-host connect timeout derived from measured round-trip times
+    
+    Follows TCP's retransmission timer (RFC 6298): a smoothed RTT and its
+    mean deviation are updated from every answered connect, and the timeout
+    is SRTT + 4 * RTTVAR, clamped between a floor and a ceiling.
+    """
+    
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+    
+    def __init__(self, initial: float = INITIAL_TIMEOUT, floor: float = MIN_TIMEOUT,
+                 ceiling: float = MAX_TIMEOUT, adaptive: bool = True):
+        self.lock = threading.Lock()
+        self.floor = floor
+        self.ceiling = ceiling
+        self.adaptive = adaptive
+        self.srtt = None
+        self.rttvar = None
+        self.samples = 0
+        self.timeout = initial
+    
+    def sample(self, rtt: float):
+        """Feed the RTT of a connect that was answered (open or refused)"""
+        if not self.adaptive:
+            return
+        with self.lock:
+            if self.srtt is None:
+                self.srtt = rtt
+                self.rttvar = rtt / 2
+            else:
+                self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+                self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+            self.samples += 1
+            self.timeout = min(self.ceiling, max(self.floor, self.srtt + self.K * self.rttvar))
+
+def address_family(address: str) -> int:
+    """Socket family for an IP (a hostname is treated as IPv4)"""
+    return socket.AF_INET6 if ':' in address else socket.AF_INET
+
+def connect_port(target: str, port: int, timeout: float = INITIAL_TIMEOUT) -> Tuple[str, float, socket.socket]:
+    """
+    Connect to a single port with a blocking connect
     
     Returns:
-        (is_open, service_name)
+        (state, rtt, sock) where rtt is None unless the host answered and
+        sock is the connected socket when the port is open (caller closes it)
     """
+    sock = socket.socket(address_family(target), socket.SOCK_STREAM)
+    sock.settimeout(timeout)
     try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+        started = time.monotonic()
         result = sock.connect_ex((target, port))
+        rtt = time.monotonic() - started
+    except socket.error:
+        # DNS resolution failed or the connect could not be attempted
+        sock.close()
+        return STATE_FILTERED, None, None
+    
+    if result == 0:
+        return STATE_OPEN, rtt, sock
+    sock.close()
+    if result == errno.ECONNREFUSED:
+        return STATE_CLOSED, rtt, None
+    return STATE_FILTERED, None, None
+
+async def async_connect_port(target: str, port: int,
+                             timeout: float = INITIAL_TIMEOUT) -> Tuple[str, float, socket.socket]:
+    """
+    Connect to a single port with a non-blocking connect on the running event loop
+    
+    Returns:
+        (state, rtt, sock) where rtt is None unless the host answered and
+        sock is the connected socket when the port is open (caller closes it)
+    """
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(address_family(target), socket.SOCK_STREAM)
+    sock.setblocking(False)
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(loop.sock_connect(sock, (target, port)), timeout)
+        return STATE_OPEN, time.monotonic() - started, sock
+    except ConnectionRefusedError:
+        sock.close()
+        return STATE_CLOSED, time.monotonic() - started, None
+    except (asyncio.TimeoutError, OSError):
+        sock.close()
+        return STATE_FILTERED, None, None
+    except BaseException:
         sock.close()
+        raise
+
+def probe_port(target: str, port: int, timeout: float = INITIAL_TIMEOUT) -> Tuple[str, float]:
+    """
+    Probe a single port with a blocking connect
+    
+    Returns:
+        (state, rtt) where rtt is None unless the host answered
+    """
+    state, rtt, sock = connect_port(target, port, timeout)
+    if sock is not None:
+        sock.close()
+    return state, rtt
+
+async def async_probe_port(target: str, port: int, timeout: float = INITIAL_TIMEOUT) -> Tuple[str, float]:
+    """
+    Probe a single port with a non-blocking connect on the running event loop
+    
+    Returns:
+        (state, rtt) where rtt is None unless the host answered
+    """
+    state, rtt, sock = await async_connect_port(target, port, timeout)
+    if sock is not None:
+        sock.close()
+    return state, rtt
+
+def scan_port(target: str, port: int, timeout: float = INITIAL_TIMEOUT) -> Tuple[bool, str]:
+    """
+    Scan a single port
+    
+    Returns:
+        (is_open, service_name)
+    """
+    state, _ = probe_port(target, port, timeout)
+    if state == STATE_OPEN:
+        return True, PORT_SERVICES.get(port, f'unknown-{port}')
+    return False, ''
+
+async def async_scan_port(target: str, port: int, timeout: float = INITIAL_TIMEOUT) -> Tuple[bool, str]:
+    """
+    Scan a single port with a non-blocking connect on the running event loop
+    
+    Returns:
+        (is_open, service_name)
+    """
+    state, _ = await async_probe_port(target, port, timeout)
+    if state == STATE_OPEN:
+        return True, PORT_SERVICES.get(port, f'unknown-{port}')
+    return False, ''
+
+def banner_probe(port: int) -> bytes:
+    """Request to send when a service waits for the client to speak first"""
+    return BANNER_PROBES.get(PORT_SERVICES.get(port), DEFAULT_BANNER_PROBE)
+
+def read_banner(sock: socket.socket, port: int, timeout: float = BANNER_TIMEOUT,
+                max_bytes: int = BANNER_BYTES) -> bytes:
+    """
+    Read a service banner from an already connected blocking socket
+    
+    Waits half the timeout for a greeting (SSH, FTP, SMTP), then sends a
+    probe and waits the other half for the reply (HTTP, Redis).
+    """
+    try:
+        sock.settimeout(timeout / 2)
+        try:
+            return sock.recv(max_bytes)
+        except socket.timeout:
+            pass
+        sock.sendall(banner_probe(port))
+        return sock.recv(max_bytes)
+    except OSError:
+        return b''
+
+async def async_read_banner(sock: socket.socket, port: int, timeout: float = BANNER_TIMEOUT,
+                            max_bytes: int = BANNER_BYTES) -> bytes:
+    """
+    Read a service banner from an already connected non-blocking socket
+    
+    Waits half the timeout for a greeting (SSH, FTP, SMTP), then sends a
+    probe and waits the other half for the reply (HTTP, Redis).
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        try:
+            return await asyncio.wait_for(loop.sock_recv(sock, max_bytes), timeout / 2)
+        except asyncio.TimeoutError:
+            pass
+        await asyncio.wait_for(loop.sock_sendall(sock, banner_probe(port)), timeout / 2)
+        return await asyncio.wait_for(loop.sock_recv(sock, max_bytes), timeout / 2)
+    except (asyncio.TimeoutError, OSError):
+        return b''
+
+def identify_service(port: int, banner: bytes) -> Tuple[str, str]:
+    """
+    Match a banner against SERVICE_SIGNATURES
+    
+    Returns:
+        (service_name, product) falling back to the port lookup when no
+        signature matches; product is None when the banner names none
+    """
+    for service, pattern in SERVICE_SIGNATURES:
+        match = pattern.search(banner)
+        if match:
+            product = match.groupdict().get('product')
+            if product:
+                product = product.decode('utf-8', errors='replace').strip()
+            return service or PORT_SERVICES.get(port, f'unknown-{port}'), product or None
+    return PORT_SERVICES.get(port, f'unknown-{port}'), None
+
+def raise_fd_limit(wanted: int):
+    """Raise the soft open-file limit so `wanted` sockets can be in flight"""
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted + 64  # Headroom for stdio, the event loop and resolver sockets
+    if soft == resource.RLIM_INFINITY or soft >= target:
+        return
+    if hard != resource.RLIM_INFINITY:
+        target = min(target, hard)
+    try:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+    except (ValueError, OSError):
+        pass
+
+class AsyncProber:
+    """Connects with non-blocking sockets on the event loop"""
+    
+    async def connect(self, target: str, port: int, timeout: float) -> Tuple[str, float, socket.socket]:
+        return await async_connect_port(target, port, timeout)
+    
+    async def read_banner(self, sock: socket.socket, port: int, timeout: float, max_bytes: int) -> bytes:
+        return await async_read_banner(sock, port, timeout, max_bytes)
+    
+    def close(self):
+        pass
+
+class ThreadProber:
+    """Connects with blocking sockets on a thread pool, awaited from the event loop"""
+    
+    def __init__(self, num_threads: int):
+        self.executor = ThreadPoolExecutor(max_workers=num_threads)
+    
+    async def connect(self, target: str, port: int, timeout: float) -> Tuple[str, float, socket.socket]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, connect_port, target, port, timeout)
+    
+    async def read_banner(self, sock: socket.socket, port: int, timeout: float, max_bytes: int) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, read_banner, sock, port, timeout, max_bytes)
+    
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+class BannerGrabber:
+    """
+    Second pipeline stage: reads banners from sockets the sweep found open
+    
+    The sweep hands over the live connection, so nothing is reconnected.
+    At most `concurrency` banners are read at once; when the stage is full
+    the sweep waits, which keeps the number of held sockets bounded.
+    """
+    
+    def __init__(self, prober, concurrency: int = BANNER_CONCURRENCY,
+                 timeout: float = BANNER_TIMEOUT, max_bytes: int = BANNER_BYTES,
+                 report=output_port):
+        self.prober = prober
+        self.report = report
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.slots = asyncio.Semaphore(concurrency)
+        self.tasks = set()
+    
+    async def submit(self, target: str, ip: str, port: int, sock: socket.socket):
+        """Queue a banner read for an open port, waiting for a free slot"""
+        try:
+            await self.slots.acquire()
+        except BaseException:
+            sock.close()
+            raise
+        task = asyncio.create_task(self.grab(target, ip, port, sock))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    async def grab(self, target: str, ip: str, port: int, sock: socket.socket):
+        """Read and identify one banner, then report the port"""
+        try:
+            banner = await self.prober.read_banner(sock, port, self.timeout, self.max_bytes)
+        finally:
+            sock.close()
+            self.slots.release()
         
-        if result == 0:
-            service = PORT_SERVICES.get(port, f'unknown-{port}')
-            return True, service
-        return False, ''
-    except socket.gaierror:
-        # DNS resolution failed
-        return False, ''
-    except socket.error:
-        # Connection error
-        return False, ''
-    except Exception:
-        return False, ''
+        service, product = identify_service(port, banner)
+        text = banner.decode('utf-8', errors='replace').strip().splitlines()
+        self.report(target, port, 'open', service,
+                    banner=text[0][:BANNER_TEXT_LIMIT] if text else None, product=product, ip=ip)
+    
+    async def drain(self):
+        """Wait for every queued banner read to finish"""
+        while self.tasks:
+            await asyncio.gather(*list(self.tasks))
 
-def worker(target: str, progress_callback):
-    """Thread worker to scan ports from the queue"""
-    while True:
-        port = scan_queue.get()
-        if port is None:
-            break
+class PortScan:
+    """
+    One scan run: a shared prober, the optional banner stage and a window
+    of active hosts, driven by a single asyncio scheduler
+    
+    Targets are pulled lazily into a window of at most `host_group` hosts.
+    Workers take ports round-robin across the window, so consecutive probes
+    go to different hosts and no single host is hammered. When a host's
+    sweep is handed out, the next target enters the window.
+    """
+    
+    def __init__(self, prober, concurrency: int, estimator_options: dict = None,
+                 host_check: bool = True, down_ports: Iterable[int] = None,
+                 banners: dict = None, host_group: int = HOST_GROUP,
+                 dns_cache: DnsCache = None, address_policy: str = 'first',
+                 checkpoint: ScanCheckpoint = None, checkpoint_interval: float = CHECKPOINT_INTERVAL,
+                 liveness_ports: Iterable[int] = LIVENESS_PORTS):
+        self.prober = prober
+        self.concurrency = concurrency
+        self.estimator_options = estimator_options or {}
+        self.host_check = host_check
+        self.down_ports = down_ports
+        self.banner_options = banners
+        self.host_group = host_group
+        self.dns_cache = dns_cache or DnsCache()
+        self.address_policy = address_policy
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.liveness_ports = tuple(liveness_ports)
+        self.banners = None
+        self.hosts = {}
+    
+    async def probe(self, host: HostState, ip: str, port: int, record: bool = True) -> str:
+        """
+        Connect to one port, feed the address's RTT estimator and report the port if open
+        
+        With record=False the probe only measures: the port is neither
+        reported nor marked in the checkpoint.
+        """
+        estimator = host.estimators[ip]
+        async with self.slots:
+            state, rtt, sock = await self.prober.connect(ip, port, estimator.timeout)
+        if rtt is not None:
+            estimator.sample(rtt)
+        if not record:
+            if sock is not None:
+                sock.close()
+            return state
+        if self.checkpoint is not None:
+            self.checkpoint.mark_port(host.index, host.target, ip, port)
+        
+        if sock is not None:
+            service = PORT_SERVICES.get(port, f'unknown-{port}')
+            if self.banners is not None:
+                if self.checkpoint is not None:
+                    # Keep the port even if the scan stops before its banner is read
+                    self.checkpoint.add_open(open_record(host.target, port, service, ip))
+                await self.banners.submit(host.target, ip, port, sock)
+            else:
+                sock.close()
+                self.report_open(host.target, port, 'open', service, ip=ip)
+        return state
+    
+    def report_open(self, target: str, port: int, state: str, service: str,
+                    banner: str = None, product: str = None, ip: str = None):
+        """Output an open port and record it in the checkpoint"""
+        output_port(target, port, state, service, banner=banner, product=product, ip=ip)
+        if self.checkpoint is not None:
+            self.checkpoint.add_open(open_record(target, port, service, ip, banner, product))
+    
+    async def check_address(self, host: HostState, ip: str) -> Dict[int, str]:
+        """
+        Probe the liveness ports of one address
+        
+        A refused connect proves the host is up just as well as an open port,
+        and every answer seeds the address's RTT estimator for the sweep.
+        Only liveness ports that are also being scanned are reported.
+        
+        Returns:
+            {port: state} for each liveness port
+        """
+        states = await asyncio.gather(*(
+            self.probe(host, ip, port, record=port in self.ports) for port in self.liveness_ports
+        ))
+        return dict(zip(self.liveness_ports, states))
+    
+    async def lookup(self, target: str) -> List[Tuple[int, str]]:
+        """Resolve a target through the DNS cache"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.dns_cache.resolve, target)
+    
+    async def resolve_host(self, host: HostState) -> List[Tuple[int, str]]:
+        """Resolve the host once; every probe then connects to an IP"""
+        addresses = await self.lookup(host.target)
+        for _, ip in addresses:
+            host.estimators[ip] = RttEstimator(**self.estimator_options)
+        return addresses
+    
+    def candidate_addresses(self, addresses: List[Tuple[int, str]]) -> List[List[str]]:
+        """
+        Group addresses for the address policy
+        
+        Returns:
+            A list of groups; the first live address of each group is swept
+            ('all' puts every address in its own group)
+        """
+        if self.address_policy == 'all':
+            return [[ip] for _, ip in addresses]
+        if self.address_policy == 'per-family':
+            groups = {}
+            for family, ip in addresses:
+                groups.setdefault(family, []).append(ip)
+            return list(groups.values())
+        return [[ip for _, ip in addresses]]
+    
+    async def select_addresses(self, host: HostState, groups: List[List[str]]) -> Dict[str, Dict[int, str]]:
+        """
+        Pick the live address of each group, trying each group's addresses in order
+        
+        Returns:
+            {ip: liveness states} for the addresses to sweep; empty when none answered
+        """
+        async def first_live(group: List[str]) -> Optional[Tuple[str, Dict[int, str]]]:
+            for ip in group:
+                states = await self.check_address(host, ip)
+                if any(state != STATE_FILTERED for state in states.values()):
+                    return ip, states
+            return None
+        
+        results = await asyncio.gather(*(first_live(group) for group in groups))
+        return dict(result for result in results if result is not None)
+    
+    async def prepare_host(self, index: int, target: str) -> Optional[HostState]:
+        """Resolve a host, check its liveness and plan its sweep; None when it needs no sweep"""
+        if target in self.hosts:
+            # Listed twice, e.g. inside overlapping CIDR blocks
+            if self.checkpoint is not None:
+                self.checkpoint.finish_host(index)
+            self.progress.finish_host()
+            return None
+        
+        host = HostState(index, target)
+        self.hosts[target] = host
+        addresses = await self.resolve_host(host)
+        if not addresses:
+            output_host(target, 'unresolved')
+            self.finish_host(host)
+            return None
+        
+        groups = self.candidate_addresses(addresses)
+        host_ports = self.ports
+        # With every liveness port excluded there is nothing to check with
+        if self.host_check and self.liveness_ports:
+            checked = await self.select_addresses(host, groups)
+            if checked:
+                output_host(target, 'up', ips=list(checked))
+            elif self.down_ports:
+                checked = {group[0]: {} for group in groups}
+                output_host(target, 'down', action='reduced', ports=len(self.down_ports), ips=list(checked))
+                host_ports = self.down_ports
+            else:
+                output_host(target, 'down', action='skipped')
+                self.finish_host(host)
+                return None
+        else:
+            checked = {group[0]: {} for group in groups}
+        
+        # Ports answered during the liveness check, or probed before the
+        # scan was resumed, are not probed again
+        skipped = {ip: self.skipped_ports(host, ip, states) for ip, states in checked.items()}
+        host.addresses = list(checked)
+        host.total = sum(
+            len(host_ports) - sum(1 for port in done if port in host_ports)
+            for done in skipped.values()
+        )
+        if host.total <= 0:
+            self.finish_host(host)
+            return None
+        host.ports = (
+            (ip, port)
+            for ip, done in skipped.items()
+            for port in host_ports
+            if port not in done
+        )
+        return host
+    
+    def skipped_ports(self, host: HostState, ip: str, states: Dict[int, str]) -> PortSet:
+        """Ports of an address that need no sweep probe"""
+        done = PortSet()
+        for port in states:
+            done.add(port)
+        if self.checkpoint is not None:
+            previous = self.checkpoint.done_ports(host.index, ip)
+            if previous is not None:
+                done.update(previous)
+        return done
+    
+    def finish_host(self, host: HostState):
+        """Drop a completed host from the window"""
+        del self.hosts[host.target]
+        if self.checkpoint is not None:
+            self.checkpoint.finish_host(host.index)
+        if host.total and host.scanned == host.total:
+            return
+        self.progress.finish_host(host.target)
+    
+    async def admit(self, index: int, target: str):
+        """Prepare a host and add it to the round-robin window"""
+        try:
+            host = await self.prepare_host(index, target)
+            if host is not None:
+                self.active.append(host)
+        finally:
+            self.preparing -= 1
+            self.wakeup.set()
+    
+    def fill_window(self):
+        """Pull targets from the lazy iterator until the window is full"""
+        while not self.targets_exhausted and len(self.active) + self.preparing < self.host_group:
+            entry = self.next_target()
+            if entry is None:
+                break
+            index, target = entry
+            if self.checkpoint is not None and self.checkpoint.host_done(index):
+                # Completed before the scan was resumed
+                self.progress.finish_host(target)
+                continue
+            self.preparing += 1
+            task = asyncio.create_task(self.admit(index, target))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+    
+    def next_target(self) -> Optional[Tuple[int, str]]:
+        """Next (index, target) to admit, or None once the targets are exhausted"""
+        entry = next(self.targets, None)
+        if entry is None:
+            self.targets_exhausted = True
+        return entry
+    
+    async def next_job(self) -> Optional[Tuple[HostState, str, int]]:
+        """Next (host, ip, port) to probe, or None once every host has been handed out"""
+        while True:
+            self.fill_window()
+            if self.active:
+                host = self.active.popleft()
+                job = next(host.ports, None)
+                if job is None:
+                    # Sweep fully handed out; the host finishes with its last probe
+                    continue
+                self.active.append(host)
+                ip, port = job
+                return host, ip, port
+            
+            if self.targets_exhausted and self.preparing == 0:
+                return None
+            self.wakeup.clear()
+            await self.wakeup.wait()
+    
+    async def sweep_worker(self):
+        """Coroutine worker that probes jobs from the window until none are left"""
+        while True:
+            job = await self.next_job()
+            if job is None:
+                return
+            host, ip, port = job
+            await self.probe(host, ip, port)
+            if self.progress.update(host):
+                self.finish_host(host)
+    
+    async def run(self, targets: Iterable[str], total_hosts: int, ports: Iterable[int],
+                  progress: ScanProgress = None):
+        """Scan every target yielded by `targets`, `total_hosts` hosts in all"""
+        self.targets = enumerate(targets)
+        self.ports = ports
+        self.progress = progress or ScanProgress(total_hosts)
+        self.slots = asyncio.Semaphore(self.concurrency)
+        self.wakeup = asyncio.Event()
+        self.active = deque()
+        self.preparing = 0
+        self.targets_exhausted = False
+        self.tasks = set()
+        if self.banner_options is not None:
+            self.banners = BannerGrabber(self.prober, report=self.report_open, **self.banner_options)
+        
+        if self.checkpoint is None:
+            await self.sweep()
+            return
         
-        is_open, service = scan_port(target, port)
-        if is_open:
-            output_port(target, port, 'open', service)
+        # Open ports found before the scan was resumed are reported again,
+        # so the output of a resumed scan is complete on its own
+        for record in self.checkpoint.open_ports():
+            output_port(**record)
         
-        progress_callback()
-        scan_queue.task_done()
+        saver = asyncio.create_task(self.save_checkpoints())
+        loop = asyncio.get_running_loop()
+        try:
+            # Eviction sends SIGTERM; cancel the scan so the checkpoint below is written
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, RuntimeError):
+            pass
+        try:
+            await self.sweep()
+        finally:
+            saver.cancel()
+            try:
+                loop.remove_signal_handler(signal.SIGTERM)
+            except (NotImplementedError, RuntimeError):
+                pass
+            self.checkpoint.save()
+    
+    async def sweep(self):
+        """Run the sweep workers, then wait for the banner stage"""
+        await asyncio.gather(*(self.sweep_worker() for _ in range(self.concurrency)))
+        
+        if self.banners is not None:
+            await self.banners.drain()
+    
+    async def save_checkpoints(self):
+        """Write the checkpoint every `checkpoint_interval` seconds"""
+        while True:
+            await asyncio.sleep(self.checkpoint_interval)
+            self.checkpoint.save()
 
-def scan_ports(target: str, ports: List[int] = None):
+def create_prober(engine: str, concurrency: int = None, banner_concurrency: int = 0):
     """
-    Scan ports on the target host
+    Prober for an engine, with the engine's default concurrency when none is given
+    
+    Returns:
+        (prober, concurrency)
+    """
+    if engine == 'async':
+        concurrency = concurrency or ASYNC_CONCURRENCY
+        raise_fd_limit(concurrency + banner_concurrency)
+        return AsyncProber(), concurrency
+    concurrency = concurrency or NUM_THREADS
+    return ThreadProber(concurrency), concurrency
+
+def scan_targets(targets: Iterable[str], ports: Iterable[int] = None, engine: str = 'thread',
+                 concurrency: int = None, timeout: float = INITIAL_TIMEOUT,
+                 min_timeout: float = MIN_TIMEOUT, max_timeout: float = MAX_TIMEOUT,
+                 adaptive_timeout: bool = True, host_check: bool = True,
+                 down_ports: Iterable[int] = None, banners: bool = False,
+                 banner_timeout: float = BANNER_TIMEOUT, banner_bytes: int = BANNER_BYTES,
+                 banner_concurrency: int = BANNER_CONCURRENCY, host_group: int = HOST_GROUP,
+                 address_policy: str = 'first', checkpoint: str = None,
+                 checkpoint_interval: float = CHECKPOINT_INTERVAL,
+                 liveness_ports: Iterable[int] = LIVENESS_PORTS):
+    """
+    Scan ports on many hosts through one shared worker pool
+    
+    Both engines share the asyncio scheduler; they differ only in how a
+    single connect is made (thread pool vs non-blocking socket).
     
     Args:
-        target: Target hostname or IP
-        ports: List of ports to scan (defaults to COMMON_PORTS)
+        targets: Target specs: hostnames, IPs, CIDR blocks or IP ranges
+        ports: Ports to scan on every host, a list or a PortSet (defaults to COMMON_PORTS)
+        engine: 'thread' for the blocking thread pool, 'async' for the asyncio engine
+        concurrency: Maximum in-flight connects (threads or coroutines)
+        timeout: Connect timeout used until a host's RTT has been measured
+        min_timeout: Floor for the adaptive per-host timeout
+        max_timeout: Ceiling for the adaptive per-host timeout
+        adaptive_timeout: Derive per-host timeouts from measured RTTs
+        host_check: Probe LIVENESS_PORTS first and skip hosts that never answer
+        down_ports: Reduced port set for hosts that fail the check (default: skip them)
+        banners: Read a banner from every open port to identify the service
+        banner_timeout: Seconds to wait for a banner, split between greeting and probe reply
+        banner_bytes: Maximum banner bytes read per port
+        banner_concurrency: Maximum banner reads in flight
+        host_group: Maximum hosts scanned side by side
+        address_policy: Which resolved addresses to sweep, one of ADDRESS_POLICIES
+        checkpoint: File to record progress in; an existing checkpoint for the
+                    same targets and ports is resumed
+        checkpoint_interval: Seconds between checkpoint writes
+        liveness_ports: Ports the liveness check may probe; leave out ports the
+                        user excluded (a resumed checkpoint keeps its own)
+    
+    Raises:
+        ValueError: If the engine or address policy is unknown, a target spec is
+                    malformed or the checkpoint belongs to a different scan
     """
     if ports is None:
         ports = COMMON_PORTS
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    if address_policy not in ADDRESS_POLICIES:
+        raise ValueError(f"Unknown address policy: {address_policy}")
     
-    total_ports = len(ports)
-    scanned = [0]  # Mutable container for closure
+    specs = list(targets)
+    validate_targets(specs)
+    total_hosts = count_targets(specs)
+    scan_checkpoint = None
+    if checkpoint:
+        scan_checkpoint = ScanCheckpoint.open_or_create(checkpoint, specs, ports, total_hosts)
+        if scan_checkpoint.liveness_ports is None:
+            scan_checkpoint.liveness_ports = list(liveness_ports)
+        liveness_ports = scan_checkpoint.liveness_ports
     
-    def update_progress():
-        scanned[0] += 1
-        if scanned[0] % 10 == 0 or scanned[0] == total_ports:
-            progress = int((scanned[0] / total_ports) * 100)
-            output_progress(progress)
+    estimator_options = {
+        'initial': timeout,
+        'floor': min_timeout,
+        'ceiling': max_timeout,
+        'adaptive': adaptive_timeout,
+    }
+    banner_options = None
+    if banners:
+        banner_options = {
+            'concurrency': banner_concurrency,
+            'timeout': banner_timeout,
+            'max_bytes': banner_bytes,
+        }
     
     output_progress(0)
     
-    # Add ports to queue
-    for port in ports:
-        scan_queue.put(port)
+    prober, concurrency = create_prober(engine, concurrency, banner_concurrency if banners else 0)
+    scan = PortScan(prober, concurrency, estimator_options, host_check=host_check,
+                    down_ports=down_ports, banners=banner_options, host_group=host_group,
+                    address_policy=address_policy, checkpoint=scan_checkpoint,
+                    checkpoint_interval=checkpoint_interval, liveness_ports=liveness_ports)
+    try:
+        asyncio.run(scan.run(expand_targets(specs), total_hosts, ports))
+    finally:
+        prober.close()
     
-    # Start worker threads
-    threads = []
-    for _ in range(NUM_THREADS):
-        t = threading.Thread(target=worker, args=(target, update_progress))
-        t.start()
-        threads.append(t)
+    output_progress(100)
+    events.flush()
+
+def scan_ports(target: str, ports: Iterable[int] = None, engine: str = 'thread',
+               concurrency: int = None, **options):
+    """
+    Scan ports on the target host
     
-    # Wait for all ports to be scanned
-    scan_queue.join()
+    Args:
+        target: Target hostname, IP, CIDR block or IP range
+        ports: Ports to scan, a list or a PortSet (defaults to COMMON_PORTS)
+        engine: 'thread' for the blocking thread pool, 'async' for the asyncio engine
+        concurrency: Maximum in-flight connects (threads or coroutines)
+        **options: Timeout, liveness and banner options passed through to scan_targets
+    """
+    scan_targets([target], ports, engine=engine, concurrency=concurrency, **options)
+
+def load_targets(targets: List[str], targets_file: str = None) -> List[str]:
+    """
+    Collect targets from argv and an optional file, deduplicated in order
     
-    # Stop workers
-    for _ in range(NUM_THREADS):
-        scan_queue.put(None)
-    for t in threads:
-        t.join()
+    A target or file name of '-' reads one target per line from stdin.
+    """
+    lines = list(targets)
+    if targets_file:
+        if targets_file == '-':
+            lines.extend(sys.stdin)
+        else:
+            with open(targets_file, 'r') as f:
+                lines.extend(f)
     
-    output_progress(100)
+    if '-' in lines:
+        lines.remove('-')
+        lines.extend(sys.stdin)
+    
+    collected = []
+    seen = set()
+    for line in lines:
+        target = line.strip()
+        if target and not target.startswith('#') and target not in seen:
+            seen.add(target)
+            collected.append(target)
+    return collected
 
 def main():
     parser = argparse.ArgumentParser(description='Port Scanner')
-    parser.add_argument('target', help='Target hostname or IP to scan')
-    parser.add_argument('--ports', help='Comma-separated list of ports to scan', default=None)
+    parser.add_argument('targets', nargs='*',
+                        help="Targets to scan: hostnames, IPs, CIDR blocks (10.0.0.0/24) or "
+                             "IP ranges (10.0.0.1-50); '-' reads targets from stdin")
+    parser.add_argument('-iL', '--targets-file', default=None,
+                        help="File with one target per line ('-' for stdin)")
+    parser.add_argument('--ports', default=None,
+                        help='Ports to scan: numbers, ranges (1-1024), profiles '
+                             '(top100, top1000, web, db, all) and !exclusions')
+    parser.add_argument('--exclude-ports', default=None,
+                        help='Ports to skip, in the same format as --ports')
+    parser.add_argument('--engine', choices=ENGINES, default='thread',
+                        help='Scan engine: blocking thread pool or asyncio event loop')
+    parser.add_argument('--concurrency', type=int, default=None,
+                        help=f'Maximum in-flight connects (default: {NUM_THREADS} threads, '
+                             f'{ASYNC_CONCURRENCY} for the async engine)')
+    parser.add_argument('--timeout', type=float, default=INITIAL_TIMEOUT,
+                        help=f'Initial connect timeout in seconds (default: {INITIAL_TIMEOUT})')
+    parser.add_argument('--min-timeout', type=float, default=MIN_TIMEOUT,
+                        help=f'Floor for the adaptive per-host timeout (default: {MIN_TIMEOUT})')
+    parser.add_argument('--max-timeout', type=float, default=MAX_TIMEOUT,
+                        help=f'Ceiling for the adaptive per-host timeout (default: {MAX_TIMEOUT})')
+    parser.add_argument('--fixed-timeout', action='store_true',
+                        help='Use --timeout for every connect instead of adapting to measured RTT')
+    parser.add_argument('--no-host-check', action='store_true',
+                        help='Sweep every host without probing liveness ports first')
+    parser.add_argument('--down-ports', default=None,
+                        help='Reduced port spec for hosts that fail the liveness check '
+                             '(default: skip them)')
+    parser.add_argument('--banners', action='store_true',
+                        help='Read banners from open ports to identify the running service')
+    parser.add_argument('--banner-timeout', type=float, default=BANNER_TIMEOUT,
+                        help=f'Seconds to wait for a banner (default: {BANNER_TIMEOUT})')
+    parser.add_argument('--banner-bytes', type=int, default=BANNER_BYTES,
+                        help=f'Maximum banner bytes read per port (default: {BANNER_BYTES})')
+    parser.add_argument('--banner-concurrency', type=int, default=BANNER_CONCURRENCY,
+                        help=f'Maximum banner reads in flight (default: {BANNER_CONCURRENCY})')
+    parser.add_argument('--host-group', type=int, default=HOST_GROUP,
+                        help=f'Maximum hosts scanned side by side (default: {HOST_GROUP})')
+    parser.add_argument('--address-policy', choices=ADDRESS_POLICIES, default='first',
+                        help='Resolved addresses to sweep: the first live one, the first live '
+                             'one per family (IPv4/IPv6), or all of them (default: first)')
+    parser.add_argument('--checkpoint', default=None,
+                        help='Record progress in this file so an interrupted scan can be resumed')
+    parser.add_argument('--checkpoint-interval', type=float, default=CHECKPOINT_INTERVAL,
+                        help=f'Seconds between checkpoint writes (default: {CHECKPOINT_INTERVAL:g})')
+    parser.add_argument('--resume', default=None, metavar='FILE',
+                        help='Continue the scan recorded in a checkpoint file; targets and '
+                             'ports are taken from the checkpoint')
     args = parser.parse_args()
     
-    target = args.target.strip()
-    
-    # Parse custom ports if provided
-    ports = COMMON_PORTS
-    if args.ports:
+    resumed = None
+    if args.resume:
+        if args.targets or args.targets_file or args.ports:
+            output_error("--resume takes targets and ports from the checkpoint")
+            sys.exit(1)
         try:
-            ports = [int(p.strip()) for p in args.ports.split(',')]
-        except ValueError:
-            output_error("Invalid port list format")
+            resumed = ScanCheckpoint.load(args.resume)
+        except (OSError, ValueError) as e:
+            output_error(f"Cannot resume scan: {e}")
             sys.exit(1)
+        args.checkpoint = args.resume
+    
+    try:
+        targets = resumed.targets if resumed else load_targets(args.targets, args.targets_file)
+    except OSError as e:
+        output_error(f"Cannot read targets file: {e}")
+        sys.exit(1)
+    
+    if not targets:
+        output_error("No targets given")
+        sys.exit(1)
+    
+    try:
+        validate_targets(targets)
+    except ValueError as e:
+        output_error(str(e))
+        sys.exit(1)
+    
+    # Compile the port spec; duplicates collapse into a single probe per port
+    try:
+        ports = resumed.ports if resumed else parse_port_spec(args.ports or 'top100', exclude=args.exclude_ports)
+        down_ports = parse_port_spec(args.down_ports, exclude=args.exclude_ports) if args.down_ports else None
+        # The liveness check never touches a port the user excluded
+        excluded = parse_port_exclusions(args.ports or 'top100', exclude=args.exclude_ports)
+        liveness_ports = [port for port in LIVENESS_PORTS if port not in excluded]
+    except ValueError as e:
+        output_error(f"Invalid port list format: {e}")
+        sys.exit(1)
+    
+    if (args.concurrency is not None and args.concurrency < 1) or args.host_group < 1:
+        output_error("Concurrency and host group must be at least 1")
+        sys.exit(1)
+    
+    if args.banner_timeout <= 0 or args.banner_bytes < 1 or args.banner_concurrency < 1:
+        output_error("Banner timeout, byte cap and concurrency must be positive")
+        sys.exit(1)
+    
+    if not (0 < args.min_timeout <= args.max_timeout) or args.timeout <= 0:
+        output_error("Timeouts must be positive and --min-timeout must not exceed --max-timeout")
+        sys.exit(1)
+    
+    if args.checkpoint_interval <= 0:
+        output_error("Checkpoint interval must be positive")
+        sys.exit(1)
+    
+    resume_hint = f"; resume with --resume {args.checkpoint}" if args.checkpoint else ""
     
     try:
-        scan_ports(target, ports)
+        scan_targets(
+            targets, ports, engine=args.engine, concurrency=args.concurrency,
+            timeout=args.timeout, min_timeout=args.min_timeout, max_timeout=args.max_timeout,
+            adaptive_timeout=not args.fixed_timeout, host_check=not args.no_host_check,
+            down_ports=down_ports, banners=args.banners, banner_timeout=args.banner_timeout,
+            banner_bytes=args.banner_bytes, banner_concurrency=args.banner_concurrency,
+            host_group=args.host_group, address_policy=args.address_policy,
+            checkpoint=args.checkpoint, checkpoint_interval=args.checkpoint_interval,
+            liveness_ports=liveness_ports
+        )
     except KeyboardInterrupt:
-        output_error("Scan interrupted by user")
+        output_error(f"Scan interrupted by user{resume_hint}")
+        sys.exit(1)
+    except asyncio.CancelledError:
+        # SIGTERM, e.g. the node is being drained
+        output_error(f"Scan interrupted by termination signal{resume_hint}")
         sys.exit(1)
     except Exception as e:
         output_error(f"Scan failed: {str(e)}")
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Port Specification
+Parses port specs such as "top100,8000-8100,!8080" into a deduplicated
+port set backed by a 65536-bit bitmap
+"""
+
+from typing import Iterator, Tuple
+
+MAX_PORT = 65535
+
+# Most common TCP service ports, in rough order of likelihood
+TOP100_PORTS = (
+    20, 21, 22, 23, 25, 53, 80, 110, 111, 135, 139, 143, 443, 445, 993, 995,
+    1723, 3306, 3389, 5900, 8080, 8443, 8888, 9090, 27017, 5432, 6379, 11211,
+    1521, 2375, 2376, 2377, 3000, 3001, 3128, 4444, 5000, 5001, 5672,
+    5984, 6000, 6001, 7000, 7001, 7547, 8000, 8001, 8008, 8009, 8010,
+    8081, 8082, 8089, 8090, 8091, 8100, 8161, 8200, 8300, 8400, 8500, 8600,
+    9000, 9001, 9009, 9091, 9092, 9093, 9094, 9095, 9096, 9097,
+    9100, 9200, 9300, 9999, 10000, 10001, 27015, 27016, 50070
+)
+
+# Named profiles; each is itself a port spec and may reference other profiles
+PORT_PROFILES = {
+    'top100': ','.join(str(port) for port in TOP100_PORTS),
+    # Every well-known port plus the registered ports services commonly run on
+    'top1000': (
+        'top100,web,db,1-1024,1080,1194,1434,1701,1883,1900,2000,2049,2121,2181,'
+        '2222,2379,2380,2483,2484,3260,3268,3269,3690,4000,4040,4369,4505,4506,'
+        '4567,4848,5060,5061,5222,5269,5353,5601,5800,5901-5903,5938,5985,5986,'
+        '6443,6660-6669,6881,7071,7077,7474,7687,8000-8100,8123,8180,8181,8222,'
+        '8243,8280,8281,8333,8530,8531,8686,8761,8800,8834,8880,8983,9042,9160,'
+        '9418,9443,9500,9600,9800,9876,9990,10250,10255,15672,16010,25565,32400,'
+        '50000,61616'
+    ),
+    'web': '80,81,443,591,2082,2083,2086,2087,3000,4443,5000,8000,8008,8080,8081,8443,8888,9000,9090,9443',
+    'db': '1433,1521,3306,5432,5984,6379,7000,7001,8086,9042,9200,9300,11211,27017,27018,28017,50000',
+    'all': f'1-{MAX_PORT}',
+}
+
+class PortSet:
+    """Deduplicated set of TCP ports stored as a bitmap, iterated in ascending order"""
+
+    def __init__(self):
+        self.bitmap = bytearray((MAX_PORT + 1) // 8)
+        self.count = 0
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'PortSet':
+        """Rebuild a set from a bitmap previously taken from `bitmap`"""
+        if len(data) != (MAX_PORT + 1) // 8:
+            raise ValueError("Port bitmap has the wrong size")
+        ports = cls()
+        ports.bitmap[:] = data
+        ports.count = ports._popcount(0, len(ports.bitmap))
+        return ports
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, port: int) -> bool:
+        return 0 < port <= MAX_PORT and bool(self.bitmap[port >> 3] & (1 << (port & 7)))
+
+    def __iter__(self) -> Iterator[int]:
+        bitmap = self.bitmap
+        for index in range(len(bitmap)):
+            byte = bitmap[index]
+            if not byte:
+                continue
+            base = index << 3
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield base + bit
+
+    def _popcount(self, start: int, end: int) -> int:
+        """Number of set bits in bitmap bytes start..end-1"""
+        return int.from_bytes(self.bitmap[start:end], 'little').bit_count()
+
+    def _fill_range(self, start: int, end: int, value: bool):
+        """Set or clear ports start..end inclusive, a whole byte at a time where possible"""
+        first, last = start >> 3, end >> 3
+        before = self._popcount(first, last + 1)
+
+        for index in range(first, last + 1):
+            low = start - (index << 3) if index == first else 0
+            high = end - (index << 3) if index == last else 7
+            mask = ((1 << (high - low + 1)) - 1) << low
+            if value:
+                self.bitmap[index] |= mask
+            else:
+                self.bitmap[index] &= ~mask & 0xFF
+
+        self.count += self._popcount(first, last + 1) - before
+
+    def add(self, port: int):
+        """Add a single port"""
+        mask = 1 << (port & 7)
+        if not self.bitmap[port >> 3] & mask:
+            self.bitmap[port >> 3] |= mask
+            self.count += 1
+
+    def add_range(self, start: int, end: int):
+        """Add ports start..end inclusive"""
+        self._fill_range(start, end, True)
+
+    def discard_range(self, start: int, end: int):
+        """Remove ports start..end inclusive"""
+        self._fill_range(start, end, False)
+
+    def update(self, other: 'PortSet'):
+        """Add every port of another set"""
+        for index, byte in enumerate(other.bitmap):
+            self.bitmap[index] |= byte
+        self.count = self._popcount(0, len(self.bitmap))
+
+    def difference_update(self, other: 'PortSet'):
+        """Remove every port of another set"""
+        for index, byte in enumerate(other.bitmap):
+            self.bitmap[index] &= ~byte & 0xFF
+        self.count = self._popcount(0, len(self.bitmap))
+
+def _parse_range(token: str) -> Tuple[int, int]:
+    """Parse "80", "1-1024", "-1024" or "8000-" into an inclusive range"""
+    if '-' in token:
+        start, _, end = token.partition('-')
+        start = int(start) if start else 1
+        end = int(end) if end else MAX_PORT
+    else:
+        start = end = int(token)
+
+    if not (1 <= start <= end <= MAX_PORT):
+        raise ValueError(f"Invalid port range: {token}")
+    return start, end
+
+def _compile(spec: str, depth: int = 0) -> Tuple[PortSet, PortSet]:
+    """Compile a spec into (included, excluded) port sets"""
+    if depth > len(PORT_PROFILES):
+        raise ValueError("Port profiles reference each other in a loop")
+
+    included = PortSet()
+    excluded = PortSet()
+    for raw in spec.split(','):
+        token = raw.strip().lower()
+        if not token:
+            continue
+
+        target = included
+        if token.startswith('!'):
+            target = excluded
+            token = token[1:].strip()
+
+        if token in PORT_PROFILES:
+            profile_included, profile_excluded = _compile(PORT_PROFILES[token], depth + 1)
+            profile_included.difference_update(profile_excluded)
+            target.update(profile_included)
+            continue
+
+        try:
+            start, end = _parse_range(token)
+        except ValueError:
+            raise ValueError(f"Invalid port spec entry: {raw.strip()}")
+        target.add_range(start, end)
+
+    return included, excluded
+
+def parse_port_spec(spec: str, exclude: str = None) -> PortSet:
+    """
+    Compile a port spec into a deduplicated PortSet
+
+    Args:
+        spec: Comma-separated ports, ranges (1-1024), profile names
+              (top100, top1000, web, db, all) and !exclusions
+        exclude: Optional second spec of ports to drop
+
+    Raises:
+        ValueError: If the spec contains an invalid entry
+    """
+    included, excluded = _compile_with_exclude(spec, exclude)
+    included.difference_update(excluded)
+    return included
+
+def parse_port_exclusions(spec: str, exclude: str = None) -> PortSet:
+    """
+    Ports a spec explicitly drops: its !exclusions plus the exclude spec
+
+    Raises:
+        ValueError: If the spec contains an invalid entry
+    """
+    return _compile_with_exclude(spec, exclude)[1]
+
+def _compile_with_exclude(spec: str, exclude: str = None) -> Tuple[PortSet, PortSet]:
+    """Compile a spec and an exclude spec into (included, excluded) port sets"""
+    included, excluded = _compile(spec)
+    if exclude:
+        extra_included, extra_excluded = _compile(exclude)
+        extra_included.difference_update(extra_excluded)
+        excluded.update(extra_included)
+    return included, excluded
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Recon Pipeline
+Enumerates subdomains and port-scans each one as soon as it resolves,
+in one process and one event loop, so recon takes as long as the slower
+stage instead of both stages back to back
+Outputs the events of both stages as one JSON-lines stream on stdout
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    from .event_writer import events
+    from .port_spec import parse_port_exclusions, parse_port_spec
+    from .port_scanner import (
+        ADDRESS_POLICIES, BANNER_BYTES, BANNER_CONCURRENCY, BANNER_TIMEOUT, COMMON_PORTS, ENGINES,
+        HOST_GROUP, INITIAL_TIMEOUT, LIVENESS_PORTS, MAX_TIMEOUT, MIN_TIMEOUT, PROGRESS_INTERVAL,
+        PortScan, ScanProgress, address_family, create_prober, output_progress,
+    )
+    from .subdomain_enum import (
+        COMMON_SUBDOMAINS, SubdomainScan, load_nameservers, open_answer_cache,
+        output_error, output_resolvers, output_wordlist,
+    )
+    from .resolver_pool import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT, ResolverPool
+    from .wildcard import WILDCARD_PROBES, WildcardDetector
+    from .wordlist import Wordlist
+    from .permutations import DEFAULT_BUDGET, DEFAULT_DEPTH
+    from .answer_cache import DEFAULT_CACHE_PATH
+except ImportError:
+    # Running as a script rather than as part of the scanners package
+    from event_writer import events
+    from port_spec import parse_port_exclusions, parse_port_spec
+    from port_scanner import (
+        ADDRESS_POLICIES, BANNER_BYTES, BANNER_CONCURRENCY, BANNER_TIMEOUT, COMMON_PORTS, ENGINES,
+        HOST_GROUP, INITIAL_TIMEOUT, LIVENESS_PORTS, MAX_TIMEOUT, MIN_TIMEOUT, PROGRESS_INTERVAL,
+        PortScan, ScanProgress, address_family, create_prober, output_progress,
+    )
+    from subdomain_enum import (
+        COMMON_SUBDOMAINS, SubdomainScan, load_nameservers, open_answer_cache,
+        output_error, output_resolvers, output_wordlist,
+    )
+    from resolver_pool import DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT, ResolverPool
+    from wildcard import WILDCARD_PROBES, WildcardDetector
+    from wordlist import Wordlist
+    from permutations import DEFAULT_BUDGET, DEFAULT_DEPTH
+    from answer_cache import DEFAULT_CACHE_PATH
+
+# Resolved hosts waiting for a place in the port scan window; while the
+# queue is full, DNS workers wait instead of racing ahead
+HOST_QUEUE = 64
+
+# Queued after the last host once subdomain enumeration is over
+_DONE = object()
+
+class StreamingPortScan(PortScan):
+    """
+    Port scan whose targets arrive while it runs
+    
+    Hosts come with the addresses the subdomain stage resolved, so they
+    are not looked up again. The window admits queued hosts whenever it
+    has room; the scan ends once close() was called and the queue drained.
+    """
+    
+    def __init__(self, *args, queue_size: int = HOST_QUEUE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.addresses: Dict[str, List[Tuple[int, str]]] = {}
+        self.received = 0
+        self.wakeup = asyncio.Event()
+    
+    async def submit(self, target: str, addresses: List[str]):
+        """Queue a resolved host, waiting while the queue is full; without addresses it is looked up"""
+        await self.queue.put((target, [(address_family(ip), ip) for ip in addresses]))
+        self.wakeup.set()
+    
+    async def close(self):
+        """Mark the end of the hosts"""
+        await self.queue.put(_DONE)
+        self.wakeup.set()
+    
+    def next_target(self) -> Optional[Tuple[int, str]]:
+        """Next queued (index, host), or None when none is waiting yet"""
+        try:
+            entry = self.queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return None
+        if entry is _DONE:
+            self.targets_exhausted = True
+            return None
+        target, addresses = entry
+        self.addresses[target] = addresses
+        self.received += 1
+        return self.received - 1, target
+    
+    async def lookup(self, target: str) -> List[Tuple[int, str]]:
+        """Addresses the subdomain stage resolved for the host"""
+        addresses = self.addresses.pop(target, [])
+        return addresses or await super().lookup(target)
+
+class ReconProgress(ScanProgress):
+    """
+    Overall progress of both stages, half each
+    
+    The host total is unknown until enumeration ends, so port progress is
+    measured against the hosts found so far, extrapolated over the part of
+    the wordlist still to come. Reported progress never goes backwards.
+    """
+    
+    def __init__(self, wordlist: Wordlist, ports: StreamingPortScan,
+                 interval: float = PROGRESS_INTERVAL):
+        super().__init__(1, interval)
+        self.wordlist = wordlist
+        self.ports = ports
+    
+    def report(self, now: float = None):
+        now = time.monotonic() if now is None else now
+        if now - self.reported_at < self.interval:
+            return
+        discovered = self.wordlist.progress()
+        scanned = min(1.0, self.completed * discovered / self.ports.received) if self.ports.received else 0.0
+        percent = min(99, int(50 * discovered + 50 * scanned))
+        if percent > self.reported:
+            self.reported = percent
+            self.reported_at = now
+            output_progress(percent)
+
+class PipelineSubdomainScan(SubdomainScan):
+    """Subdomain enumeration that hands every resolved name to a StreamingPortScan"""
+    
+    def __init__(self, *args, ports: StreamingPortScan, progress: ReconProgress, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ports = ports
+        self.progress = progress
+    
+    async def found_name(self, name: str, records: Dict[str, List[str]]):
+        await super().found_name(name, records)
+        addresses = records.get('A', []) + records.get('AAAA', [])
+        if addresses:
+            # Blocks while the port scan is HOST_QUEUE hosts behind
+            await self.ports.submit(name, addresses)
+    
+    def report(self):
+        self.progress.report()
+
+async def run_stages(subdomains: PipelineSubdomainScan, ports: StreamingPortScan,
+                     progress: ReconProgress, domain: str, wordlist: Wordlist,
+                     port_list: Iterable[int]):
+    """
+    Run both stages side by side; if either fails, the other is cancelled
+    
+    When no name resolved, the root domain is still port-scanned.
+    """
+    async def discover():
+        await subdomains.run(domain, wordlist)
+        if not subdomains.found:
+            await ports.submit(domain, [])
+        await ports.close()
+    
+    stages = [
+        asyncio.create_task(discover()),
+        asyncio.create_task(ports.run((), 0, port_list, progress)),
+    ]
+    try:
+        await asyncio.gather(*stages)
+    finally:
+        for stage in stages:
+            stage.cancel()
+
+def run_recon(domain: str, wordlist: List[str] = None, wordlist_file: str = None,
+              nameservers: List[str] = None, trusted_nameservers: List[str] = None,
+              dns_concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+              retries: int = DEFAULT_RETRIES, dns_timeout: float = DEFAULT_TIMEOUT,
+              wildcard_probes: int = WILDCARD_PROBES, permutation_budget: int = 0,
+              permutation_depth: int = DEFAULT_DEPTH, cache_path: str = None,
+              refresh: bool = False, ports: Iterable[int] = None, engine: str = 'thread',
+              port_concurrency: int = None, timeout: float = INITIAL_TIMEOUT,
+              host_check: bool = True, banners: bool = False, host_group: int = HOST_GROUP,
+              address_policy: str = 'first', queue_size: int = HOST_QUEUE,
+              liveness_ports: Iterable[int] = LIVENESS_PORTS):
+    """
+    Enumerate subdomains of a domain and port-scan each one as it resolves
+    
+    Args:
+        domain: Target domain (e.g., example.com)
+        wordlist: Labels to try (defaults to COMMON_SUBDOMAINS)
+        wordlist_file: Wordlist file streamed from disk instead of `wordlist`
+        nameservers: Resolver IPs, optionally with :port (defaults to /etc/resolv.conf)
+        trusted_nameservers: Resolvers that re-verify positive answers from `nameservers`
+        dns_concurrency: Maximum DNS queries in flight
+        rate: Queries per second sent to each nameserver (0 for no cap)
+        retries: Extra DNS attempts after a timeout or server failure
+        dns_timeout: Seconds to wait for each DNS answer
+        wildcard_probes: Random labels resolved per zone to detect wildcards (0 disables filtering)
+        permutation_budget: Permutations of found names to resolve after the wordlist (0 disables)
+        permutation_depth: Rounds of permuting the names each round found
+        cache_path: SQLite answer cache shared across scans (None disables caching)
+        refresh: Re-query every name instead of using fresh cached answers
+        ports: Ports to scan on every host, a list or a PortSet (defaults to COMMON_PORTS)
+        engine: 'thread' for the blocking thread pool, 'async' for the asyncio engine
+        port_concurrency: Maximum in-flight connects (threads or coroutines)
+        timeout: Connect timeout used until a host's RTT has been measured
+        host_check: Probe liveness ports first and skip hosts that never answer
+        banners: Read a banner from every open port to identify the service
+        host_group: Maximum hosts port-scanned side by side
+        address_policy: Which resolved addresses to sweep, one of ADDRESS_POLICIES
+        queue_size: Resolved hosts allowed to wait for the port scan before DNS slows down
+        liveness_ports: Ports the liveness check may probe; leave out ports the user excluded
+    
+    Raises:
+        ValueError: If the engine, address policy or a nameserver is invalid
+        OSError: If the wordlist file cannot be read
+    """
+    if ports is None:
+        ports = COMMON_PORTS
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    if address_policy not in ADDRESS_POLICIES:
+        raise ValueError(f"Unknown address policy: {address_policy}")
+    
+    if wordlist_file:
+        labels = Wordlist(path=wordlist_file)
+    else:
+        labels = Wordlist(labels=COMMON_SUBDOMAINS if wordlist is None else wordlist)
+    
+    cache = open_answer_cache(cache_path, refresh)
+    pool = ResolverPool(nameservers, concurrency=dns_concurrency, rate=rate, retries=retries,
+                        timeout=dns_timeout, trusted=trusted_nameservers, cache=cache)
+    
+    estimator_options = {'initial': timeout, 'floor': MIN_TIMEOUT, 'ceiling': MAX_TIMEOUT}
+    banner_options = None
+    if banners:
+        banner_options = {
+            'concurrency': BANNER_CONCURRENCY,
+            'timeout': BANNER_TIMEOUT,
+            'max_bytes': BANNER_BYTES,
+        }
+    
+    output_progress(0)
+    
+    prober, port_concurrency = create_prober(engine, port_concurrency, BANNER_CONCURRENCY if banners else 0)
+    
+    async def recon():
+        port_scan = StreamingPortScan(prober, port_concurrency, estimator_options,
+                                      host_check=host_check, banners=banner_options,
+                                      host_group=host_group, address_policy=address_policy,
+                                      queue_size=queue_size, liveness_ports=liveness_ports)
+        progress = ReconProgress(labels, port_scan)
+        wildcards = WildcardDetector(pool, wildcard_probes) if wildcard_probes > 0 else None
+        subdomain_scan = PipelineSubdomainScan(pool, dns_concurrency, wildcards, permutation_budget,
+                                               permutation_depth, ports=port_scan, progress=progress)
+        await run_stages(subdomain_scan, port_scan, progress, domain, labels, ports)
+    
+    try:
+        asyncio.run(recon())
+    finally:
+        prober.close()
+        if cache is not None:
+            cache.close()
+    
+    output_resolvers(pool.health(), cache.stats() if cache is not None else None)
+    output_wordlist(labels.stats())
+    output_progress(100)
+    events.flush()
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description='Subdomain Enumeration and Port Scanning Pipeline')
+    parser.add_argument('domain', help='Target domain to scan (e.g., example.com)')
+    parser.add_argument('-w', '--wordlist', default=None,
+                        help='Wordlist file with one label per line (default: built-in top 100)')
+    parser.add_argument('--resolvers', default=None,
+                        help='Comma-separated nameserver IPs, optionally with :port '
+                             '(default: system resolvers)')
+    parser.add_argument('--resolvers-file', default=None,
+                        help='File with one nameserver per line, added to --resolvers')
+    parser.add_argument('--trusted-resolvers', default=None,
+                        help='Comma-separated nameservers that re-verify every positive answer')
+    parser.add_argument('--dns-concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum DNS queries in flight (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Queries per second per resolver, 0 for no cap (default: {DEFAULT_RATE})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'DNS retries after a timeout or server failure (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--dns-timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds to wait for each DNS answer (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--no-wildcard-filter', action='store_true',
+                        help='Report names even when they only resolve through a wildcard')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f'SQLite DNS answer cache shared across scans (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor write the DNS answer cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-query every name, ignoring fresh cached answers (the cache is still updated)')
+    parser.add_argument('--permutations', action='store_true',
+                        help='Resolve permutations of found names (dev-api, api2, staging.api)')
+    parser.add_argument('--ports', default=None,
+                        help='Ports to scan, e.g. 80,443,8000-8100 or top100 (default: top100)')
+    parser.add_argument('--exclude-ports', default=None,
+                        help='Ports to leave out of --ports')
+    parser.add_argument('--engine', choices=ENGINES, default='thread',
+                        help='Port scan engine: thread (blocking thread pool) or async (asyncio sockets)')
+    parser.add_argument('--port-concurrency', type=int, default=None,
+                        help='Maximum in-flight connects (default: 50 threads / 1000 coroutines)')
+    parser.add_argument('--timeout', type=float, default=INITIAL_TIMEOUT,
+                        help=f'Initial connect timeout in seconds (default: {INITIAL_TIMEOUT})')
+    parser.add_argument('--no-host-check', action='store_true',
+                        help='Sweep every host without checking liveness first')
+    parser.add_argument('--banners', action='store_true',
+                        help='Grab banners from open ports to identify services')
+    parser.add_argument('--host-group', type=int, default=HOST_GROUP,
+                        help=f'Maximum hosts port-scanned side by side (default: {HOST_GROUP})')
+    parser.add_argument('--address-policy', choices=ADDRESS_POLICIES, default='first',
+                        help='Resolved addresses to sweep: first live one, first per family, or all')
+    parser.add_argument('--queue-size', type=int, default=HOST_QUEUE,
+                        help=f'Resolved hosts waiting for the port scan before DNS slows down '
+                             f'(default: {HOST_QUEUE})')
+    args = parser.parse_args()
+    
+    domain = args.domain.strip()
+    
+    # Validate domain
+    if not domain or '/' in domain or ' ' in domain:
+        output_error(f"Invalid domain: {domain}")
+        sys.exit(1)
+    
+    if args.dns_concurrency < 1 or args.retries < 0 or args.rate < 0 or args.dns_timeout <= 0:
+        output_error("DNS concurrency and timeout must be positive; retries and rate must not be negative")
+        sys.exit(1)
+    
+    if ((args.port_concurrency is not None and args.port_concurrency < 1) or args.host_group < 1
+            or args.queue_size < 1 or args.timeout <= 0):
+        output_error("Port concurrency, host group, queue size and timeout must be positive")
+        sys.exit(1)
+    
+    try:
+        ports = parse_port_spec(args.ports or 'top100', exclude=args.exclude_ports)
+        excluded = parse_port_exclusions(args.ports or 'top100', exclude=args.exclude_ports)
+    except ValueError as e:
+        output_error(f"Invalid port list format: {e}")
+        sys.exit(1)
+    
+    try:
+        nameservers = load_nameservers(args.resolvers, args.resolvers_file)
+    except OSError as e:
+        output_error(f"Cannot read resolvers file: {e}")
+        sys.exit(1)
+    trusted = load_nameservers(args.trusted_resolvers)
+    
+    try:
+        run_recon(domain, wordlist_file=args.wordlist, nameservers=nameservers,
+                  trusted_nameservers=trusted, dns_concurrency=args.dns_concurrency,
+                  rate=args.rate, retries=args.retries, dns_timeout=args.dns_timeout,
+                  wildcard_probes=0 if args.no_wildcard_filter else WILDCARD_PROBES,
+                  permutation_budget=DEFAULT_BUDGET if args.permutations else 0,
+                  cache_path=None if args.no_cache else args.cache, refresh=args.refresh,
+                  ports=ports, engine=args.engine, port_concurrency=args.port_concurrency,
+                  timeout=args.timeout, host_check=not args.no_host_check, banners=args.banners,
+                  host_group=args.host_group, address_policy=args.address_policy,
+                  queue_size=args.queue_size,
+                  liveness_ports=[port for port in LIVENESS_PORTS if port not in excluded])
+    except ValueError as e:
+        output_error(str(e))
+        sys.exit(1)
+    except OSError as e:
+        output_error(f"Cannot read wordlist: {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        output_error("Scan interrupted by user")
+        sys.exit(1)
+    except Exception as e:
+        output_error(f"Scan failed: {str(e)}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
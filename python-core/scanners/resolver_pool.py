@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Resolver Pool
+Concurrent DNS resolution over raw UDP queries (TCP when truncated),
+spread across nameservers by health score, with a shared in-flight limit,
+per-nameserver rate caps, ejection of failing nameservers and retries on
+timeouts and server failures
+"""
+
+import time
+import random
+import asyncio
+import ipaddress
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import dns.asyncquery
+import dns.exception
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+
+# Queries in flight across all nameservers
+DEFAULT_CONCURRENCY = 100
+# Queries per second sent to each nameserver (0 for no cap)
+DEFAULT_RATE = 150
+# Extra attempts after a timeout or server failure
+DEFAULT_RETRIES = 2
+# Seconds to wait for one answer
+DEFAULT_TIMEOUT = 2.0
+# Used when no nameservers are given and /etc/resolv.conf has none
+FALLBACK_NAMESERVERS = ['8.8.8.8', '1.1.1.1']
+
+# Health scoring: smoothing factors for latency and error rate
+LATENCY_ALPHA = 1 / 8
+ERROR_ALPHA = 1 / 10
+# Consecutive failures (timeouts, SERVFAIL, REFUSED) before a nameserver is ejected
+EJECT_AFTER = 3
+# First ejection in seconds; doubles with each repeat ejection up to the cap
+EJECT_SECONDS = 30.0
+MAX_EJECT_SECONDS = 300.0
+# Floor for a nameserver's share so a bad one still gets the odd query
+MIN_HEALTH = 0.05
+
+# Record types looked up for every candidate name
+RECORD_TYPES = ('A', 'AAAA', 'CNAME')
+
+# Answer status
+STATUS_OK = 'ok'
+STATUS_NXDOMAIN = 'nxdomain'
+STATUS_NODATA = 'nodata'
+STATUS_ERROR = 'error'
+
+class Answer:
+    """Outcome of one (name, record type) lookup"""
+
+    def __init__(self, status: str, records: List[str] = None, ttl: int = 0):
+        self.status = status
+        self.records = records or []
+        self.ttl = ttl
+
+    def __repr__(self) -> str:
+        return f"Answer({self.status!r}, {self.records!r}, ttl={self.ttl})"
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second, bursting up to `rate`"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class Nameserver:
+    """
+    One upstream resolver: its rate cap and health score
+    
+    Latency is a smoothed RTT of answered queries and the error rate a
+    smoothed share of failed ones. After EJECT_AFTER consecutive failures
+    the nameserver is ejected for a while, longer each time it relapses.
+    """
+
+    def __init__(self, address: str, port: int = 53, rate: float = DEFAULT_RATE):
+        self.address = address
+        self.port = port
+        self.limiter = RateLimiter(rate)
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.queries = 0
+        self.errors = 0
+
+    def __repr__(self) -> str:
+        return f"Nameserver({self.address!r}, {self.port})"
+
+    def weight(self, default_latency: float) -> float:
+        """Selection weight: healthier and faster nameservers get more queries"""
+        latency = self.latency if self.latency is not None else default_latency
+        return max(MIN_HEALTH, 1.0 - self.error_rate) / max(latency, 0.001)
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    def record_success(self, rtt: float):
+        self.queries += 1
+        self.latency = rtt if self.latency is None else self.latency + LATENCY_ALPHA * (rtt - self.latency)
+        self.error_rate -= ERROR_ALPHA * self.error_rate
+        self.failures = 0
+        self.ejections = 0
+
+    def record_failure(self, now: float):
+        self.queries += 1
+        self.errors += 1
+        self.error_rate += ERROR_ALPHA * (1.0 - self.error_rate)
+        self.failures += 1
+        if self.failures >= EJECT_AFTER:
+            self.ejected_until = now + min(MAX_EJECT_SECONDS, EJECT_SECONDS * 2 ** self.ejections)
+            self.ejections += 1
+            self.failures = 0
+
+    def health(self) -> dict:
+        """Counters for reporting"""
+        return {
+            'address': self.address,
+            'port': self.port,
+            'queries': self.queries,
+            'errors': self.errors,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'ejected': not self.available(time.monotonic()),
+        }
+
+def parse_nameserver(spec: str) -> Tuple[str, int]:
+    """
+    Parse "1.1.1.1", "1.1.1.1:5353", "2606:4700::1111" or "[2606:4700::1111]:5353"
+
+    Raises:
+        ValueError: If spec is not an IP address with an optional port
+    """
+    spec = spec.strip()
+    address, port = spec, 53
+    if spec.startswith('['):
+        address, _, rest = spec[1:].partition(']')
+        if rest:
+            if not rest.startswith(':'):
+                raise ValueError(f"Invalid nameserver: {spec}")
+            port = rest[1:]
+    elif spec.count(':') == 1:
+        address, port = spec.split(':')
+
+    try:
+        ipaddress.ip_address(address)
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"Invalid nameserver: {spec}")
+    if not 0 < port < 65536:
+        raise ValueError(f"Invalid nameserver: {spec}")
+    return address, port
+
+def system_nameservers() -> List[str]:
+    """Nameservers from /etc/resolv.conf, or public fallbacks when there are none"""
+    try:
+        nameservers = dns.resolver.Resolver().nameservers
+    except dns.resolver.NoResolverConfiguration:
+        nameservers = []
+    return [str(ns) for ns in nameservers] or list(FALLBACK_NAMESERVERS)
+
+class ResolverPool:
+    """
+    Resolves names concurrently across a set of nameservers
+
+    Every query waits for a free in-flight slot, picks a nameserver at
+    random weighted by its health score, and waits for that nameserver's
+    rate limiter. Timeouts, SERVFAIL/REFUSED answers and socket errors
+    are retried on another nameserver. With trusted nameservers, positive
+    answers from the others are re-verified before they are believed.
+    With an answer cache, fresh cached answers are served without a query.
+    """
+
+    def __init__(self, nameservers: List[str] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 rate: float = DEFAULT_RATE, retries: int = DEFAULT_RETRIES,
+                 timeout: float = DEFAULT_TIMEOUT, trusted: List[str] = None, cache=None):
+        self.nameservers = [
+            Nameserver(*parse_nameserver(spec), rate=rate)
+            for spec in (nameservers or system_nameservers())
+        ]
+        self.trusted = [Nameserver(*parse_nameserver(spec), rate=rate) for spec in (trusted or [])]
+        self.concurrency = concurrency
+        self.retries = retries
+        self.timeout = timeout
+        self.cache = cache
+        self.slots = None
+
+    def pick(self, nameservers: List[Nameserver], tried: List[Nameserver]) -> Nameserver:
+        """
+        Weighted random choice among available nameservers not yet tried for this query
+        
+        When every candidate is ejected, the one due back first is used
+        rather than failing the query outright.
+        """
+        now = time.monotonic()
+        untried = [ns for ns in nameservers if ns not in tried] or nameservers
+        candidates = [ns for ns in untried if ns.available(now)]
+        if not candidates:
+            return min(untried, key=lambda ns: ns.ejected_until)
+        if len(candidates) == 1:
+            return candidates[0]
+        # Nameservers with no answers yet are assumed to take half the timeout
+        weights = [ns.weight(self.timeout / 2) for ns in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    async def resolve(self, name: str, rtype: str = 'A', cached: bool = True) -> Answer:
+        """
+        Look up one record type for a name
+
+        Args:
+            cached: Use and fill the answer cache (off for throwaway names)
+
+        Returns:
+            An Answer; its status is STATUS_ERROR when every attempt failed
+        """
+        use_cache = cached and self.cache is not None
+        if use_cache:
+            answer = self.cache.get(name, rtype)
+            if answer is not None:
+                return answer
+
+        if self.slots is None:
+            # Created lazily so the pool binds to the running event loop
+            self.slots = asyncio.Semaphore(self.concurrency)
+
+        query = dns.message.make_query(name, rtype)
+        async with self.slots:
+            answer = await self.attempt(self.nameservers, query, rtype)
+            if answer.status == STATUS_OK and self.trusted:
+                # A lying or poisoned resolver must not invent hosts
+                verified = await self.attempt(self.trusted, query, rtype)
+                if verified.status != STATUS_ERROR:
+                    answer = verified
+
+        if use_cache:
+            self.cache.put(name, rtype, answer)
+        return answer
+
+    async def resolve_many(self, name: str, rtypes: Iterable[str] = RECORD_TYPES,
+                           cached: bool = True) -> Dict[str, Answer]:
+        """Look up several record types for a name at once; {rtype: Answer}"""
+        rtypes = list(rtypes)
+        answers = await asyncio.gather(*(self.resolve(name, rtype, cached) for rtype in rtypes))
+        return dict(zip(rtypes, answers))
+
+    async def attempt(self, nameservers: List[Nameserver], query: dns.message.Message,
+                      rtype: str) -> Answer:
+        """Send a query to up to 1 + retries nameservers of a group until one answers"""
+        tried = []
+        for _ in range(self.retries + 1):
+            nameserver = self.pick(nameservers, tried)
+            tried.append(nameserver)
+            await nameserver.limiter.acquire()
+            answer = await self.query(nameserver, query, rtype)
+            if answer is not None:
+                return answer
+        return Answer(STATUS_ERROR)
+
+    def health(self) -> List[dict]:
+        """Health counters of every nameserver, trusted ones last"""
+        return [ns.health() for ns in self.nameservers + self.trusted]
+
+    async def query(self, nameserver: Nameserver, query: dns.message.Message,
+                    rtype: str) -> Optional[Answer]:
+        """Send one query and score the nameserver; None when it should be retried elsewhere"""
+        started = time.monotonic()
+        try:
+            response, _ = await dns.asyncquery.udp_with_fallback(
+                query, nameserver.address, timeout=self.timeout, port=nameserver.port
+            )
+        except (dns.exception.DNSException, OSError, EOFError):
+            # Timeouts, malformed replies and unreachable servers
+            nameserver.record_failure(time.monotonic())
+            return None
+
+        rcode = response.rcode()
+        if rcode not in (dns.rcode.NOERROR, dns.rcode.NXDOMAIN):
+            # SERVFAIL, REFUSED and friends say nothing about the name
+            nameserver.record_failure(time.monotonic())
+            return None
+        nameserver.record_success(time.monotonic() - started)
+
+        if rcode == dns.rcode.NXDOMAIN:
+            return Answer(STATUS_NXDOMAIN, ttl=negative_ttl(response))
+        return parse_answer(response, rtype)
+
+def parse_answer(response: dns.message.Message, rtype: str) -> Answer:
+    """Collect the records of the asked type, following any CNAME chain in the answer"""
+    rdtype = dns.rdatatype.from_text(rtype)
+    records = []
+    ttls = []
+    for rrset in response.answer:
+        if rrset.rdtype == rdtype:
+            records.extend(str(rdata).rstrip('.') if rdtype == dns.rdatatype.CNAME else str(rdata)
+                           for rdata in rrset)
+            ttls.append(rrset.ttl)
+    if not records:
+        return Answer(STATUS_NODATA, ttl=negative_ttl(response))
+    return Answer(STATUS_OK, records, min(ttls))
+
+def negative_ttl(response: dns.message.Message) -> int:
+    """TTL for a negative answer: the SOA minimum from the authority section (RFC 2308)"""
+    for rrset in response.authority:
+        if rrset.rdtype == dns.rdatatype.SOA:
+            return min(rrset.ttl, rrset[0].minimum)
+    return 0
@@ -1,18 +1,43 @@
 #!/usr/bin/env python3
 """
 Subdomain Enumeration Scanner
-Discovers subdomains for a target domain using DNS queries
+Discovers subdomains for a target domain using concurrent DNS queries
 Outputs results as JSON lines to stdout for real-time processing
 """
 
 import sys
 import json
-import dns.resolver
-import socket
+import time
+import asyncio
+import sqlite3
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, List, Optional
 import argparse
 
+try:
+    from .event_writer import events
+    from .resolver_pool import (
+        DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+        RECORD_TYPES, STATUS_OK, ResolverPool,
+    )
+    from .wildcard import WILDCARD_PROBES, WildcardDetector
+    from .wordlist import Wordlist
+    from .bloom import BloomFilter
+    from .permutations import DEFAULT_BUDGET, DEFAULT_DEPTH, permute_labels
+    from .answer_cache import DEFAULT_CACHE_PATH, AnswerCache
+except ImportError:
+    # Running as a script rather than as part of the scanners package
+    from event_writer import events
+    from resolver_pool import (
+        DEFAULT_CONCURRENCY, DEFAULT_RATE, DEFAULT_RETRIES, DEFAULT_TIMEOUT,
+        RECORD_TYPES, STATUS_OK, ResolverPool,
+    )
+    from wildcard import WILDCARD_PROBES, WildcardDetector
+    from wordlist import Wordlist
+    from bloom import BloomFilter
+    from permutations import DEFAULT_BUDGET, DEFAULT_DEPTH, permute_labels
+    from answer_cache import DEFAULT_CACHE_PATH, AnswerCache
+
 # Common subdomain wordlist (top 100)
 COMMON_SUBDOMAINS = [
     'www', 'mail', 'ftp', 'localhost', 'webmail', 'smtp', 'pop', 'ns1', 'webdisk',
@@ -29,11 +54,15 @@ COMMON_SUBDOMAINS = [
     'crm', 'erp', 'sso', 'auth', 'login', 'oauth', 'account', 'accounts'
 ]
 
+# Minimum seconds between progress events
+PROGRESS_INTERVAL = 0.5
+
 def output_progress(percent: int):
     """Output progress update"""
-    print(json.dumps({'type': 'progress', 'percent': percent}), flush=True)
+    events.emit({'type': 'progress', 'percent': percent})
 
-def output_subdomain(subdomain: str, ip_addresses: List[str]):
+def output_subdomain(subdomain: str, ip_addresses: List[str], records: Dict[str, List[str]] = None,
+                     dangling: bool = False):
     """Output subdomain discovery result"""
     result = {
         'type': 'subdomain',
@@ -41,58 +70,261 @@ def output_subdomain(subdomain: str, ip_addresses: List[str]):
         'ip': ip_addresses,
         'discovered_at': datetime.now().isoformat()
     }
-    print(json.dumps(result), flush=True)
+    if records is not None:
+        result['records'] = records
+    if dangling:
+        # CNAME to a name that does not resolve: a takeover candidate
+        result['dangling'] = True
+    events.emit(result)
+
+def output_wildcard(zone: str, records: List[str]):
+    """Output a detected wildcard zone; names resolving only to it are filtered"""
+    events.emit({'type': 'wildcard', 'domain': zone, 'records': records})
+
+def output_resolvers(health: List[Dict], cache: Dict = None):
+    """Output per-resolver query, error and latency counters, and answer cache hits"""
+    event = {'type': 'resolvers', 'resolvers': health}
+    if cache is not None:
+        event['cache'] = cache
+    events.emit(event)
+
+def output_wordlist(stats: Dict):
+    """Output wordlist dedup counters, including labels likely lost to Bloom filter false positives"""
+    events.emit({'type': 'wordlist', **stats})
 
 def output_error(message: str):
     """Output error message"""
+    # Keep errors after the events that preceded them
+    events.flush()
     print(json.dumps({'type': 'error', 'message': message}), flush=True, file=sys.stderr)
 
-def resolve_subdomain(subdomain: str) -> List[str]:
-    """Resolve subdomain to IP addresses"""
+class SubdomainScan:
+    """
+    One enumeration run: `concurrency` workers pull candidate names lazily
+    and resolve them through a shared ResolverPool
+    
+    With a WildcardDetector, names whose answers only repeat their zone's
+    wildcard are dropped instead of reported. With a permutation budget,
+    names found by the wordlist pass seed further rounds of candidates.
+    """
+    
+    def __init__(self, pool: ResolverPool, concurrency: int = DEFAULT_CONCURRENCY,
+                 wildcards: WildcardDetector = None, permutation_budget: int = 0,
+                 permutation_depth: int = DEFAULT_DEPTH):
+        self.pool = pool
+        self.concurrency = concurrency
+        self.wildcards = wildcards
+        self.permutation_budget = permutation_budget
+        self.permutation_depth = permutation_depth
+        self.found = set()
+        # Found names in discovery order; each permutation round seeds from the previous one's finds
+        self.discovered = []
+    
+    async def check(self, name: str) -> bool:
+        """Resolve one candidate's A, AAAA and CNAME records together and report it if any exist"""
+        if name in self.found:
+            return True
+        answers = await self.pool.resolve_many(name, RECORD_TYPES)
+        records = {
+            rtype: answer.records
+            for rtype, answer in answers.items()
+            if answer.status == STATUS_OK
+        }
+        if not records:
+            return False
+        values = [value for rtype_records in records.values() for value in rtype_records]
+        if self.wildcards is not None and await self.wildcards.matches(name, values, self.domain):
+            return False
+        await self.found_name(name, records)
+        return True
+    
+    async def found_name(self, name: str, records: Dict[str, List[str]]):
+        """Record and report a name that resolved to something other than a wildcard"""
+        self.found.add(name)
+        self.discovered.append(name)
+        addresses = records.get('A', []) + records.get('AAAA', [])
+        output_subdomain(name, addresses, records, dangling='CNAME' in records and not addresses)
+    
+    async def worker(self):
+        """Resolve candidates until none are left"""
+        for label in self.candidates:
+            await self.check(f"{label}.{self.domain}")
+            self.report()
+    
+    def report(self):
+        """Emit progress when the whole percentage changed, at most once per interval"""
+        now = time.monotonic()
+        if now - self.reported_at < PROGRESS_INTERVAL:
+            return
+        percent = min(99, int(self.wordlist.progress() * 100))
+        if percent != self.reported:
+            self.reported = percent
+            self.reported_at = now
+            output_progress(percent)
+    
+    async def run(self, domain: str, wordlist: Wordlist):
+        """Resolve every label under domain, then the domain itself"""
+        self.domain = domain
+        self.wordlist = wordlist
+        # Workers share one iterator, so each label is taken exactly once
+        self.candidates = iter(wordlist)
+        self.reported = 0
+        self.reported_at = 0.0
+        
+        if self.wildcards is not None:
+            # Fingerprint the apex wildcard before any candidate is judged
+            fingerprint = await self.wildcards.fingerprint(domain)
+            if fingerprint:
+                output_wildcard(domain, sorted(fingerprint))
+        
+        await asyncio.gather(*(self.worker() for _ in range(self.concurrency)))
+        
+        # Also check the root domain
+        await self.check(domain)
+        
+        if self.permutation_budget > 0:
+            await self.permute()
+    
+    def seeds(self, names: List[str]) -> List[str]:
+        """Labels of found names relative to the apex domain"""
+        return [name[:-len(self.domain) - 1] for name in names if name != self.domain]
+    
+    def unseen(self, candidates, tried: BloomFilter):
+        """Candidates not yet queried by any pass, until the budget runs out"""
+        for label in candidates:
+            if self.budget <= 0:
+                return
+            if label in self.wordlist.seen or not tried.add(label):
+                continue
+            self.budget -= 1
+            yield label
+    
+    async def permute(self):
+        """Resolve permutations of found names, round by round, within the candidate budget"""
+        self.budget = self.permutation_budget
+        tried = BloomFilter(self.permutation_budget)
+        seeds = self.seeds(self.discovered)
+        for _ in range(self.permutation_depth):
+            if not seeds or self.budget <= 0:
+                break
+            round_start = len(self.discovered)
+            self.candidates = self.unseen(permute_labels(seeds), tried)
+            await asyncio.gather(*(self.worker() for _ in range(self.concurrency)))
+            seeds = self.seeds(self.discovered[round_start:])
+
+def open_answer_cache(path: str = None, refresh: bool = False) -> Optional[AnswerCache]:
+    """Open the answer cache, or None when caching is off or the file is unusable"""
+    if not path:
+        return None
     try:
-        answers = dns.resolver.resolve(subdomain, 'A')
-        return [str(rdata) for rdata in answers]
-    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer, dns.resolver.NoNameservers):
-        return []
-    except Exception as e:
-        # Silently skip resolution errors
-        return []
+        return AnswerCache(path, refresh=refresh)
+    except (sqlite3.Error, OSError) as e:
+        # A broken cache only costs speed; scan without it
+        output_error(f"DNS cache disabled: {e}")
+        return None
 
-def enumerate_subdomains(domain: str):
+def enumerate_subdomains(domain: str, wordlist: List[str] = None, wordlist_file: str = None,
+                         nameservers: List[str] = None, trusted_nameservers: List[str] = None,
+                         concurrency: int = DEFAULT_CONCURRENCY, rate: float = DEFAULT_RATE,
+                         retries: int = DEFAULT_RETRIES, timeout: float = DEFAULT_TIMEOUT,
+                         wildcard_probes: int = WILDCARD_PROBES, permutation_budget: int = 0,
+                         permutation_depth: int = DEFAULT_DEPTH, cache_path: str = None,
+                         refresh: bool = False):
     """
     Enumerate subdomains for the given domain
     
     Args:
         domain: Target domain (e.g., example.com)
+        wordlist: Labels to try (defaults to COMMON_SUBDOMAINS)
+        wordlist_file: Wordlist file streamed from disk instead of `wordlist`
+        nameservers: Resolver IPs, optionally with :port (defaults to /etc/resolv.conf)
+        trusted_nameservers: Resolvers that re-verify positive answers from `nameservers`
+        concurrency: Maximum DNS queries in flight
+        rate: Queries per second sent to each nameserver (0 for no cap)
+        retries: Extra attempts, on another nameserver, after a timeout or server failure
+        timeout: Seconds to wait for each answer
+        wildcard_probes: Random labels resolved per zone to detect wildcards (0 disables filtering)
+        permutation_budget: Permutations of found names to resolve after the wordlist (0 disables)
+        permutation_depth: Rounds of permuting the names each round found
+        cache_path: SQLite answer cache shared across scans (None disables caching)
+        refresh: Re-query every name instead of using fresh cached answers
+    
+    Raises:
+        ValueError: If a nameserver is not an IP address
+        OSError: If the wordlist file cannot be read
     """
-    discovered = []
-    total = len(COMMON_SUBDOMAINS)
+    if wordlist_file:
+        labels = Wordlist(path=wordlist_file)
+    else:
+        labels = Wordlist(labels=COMMON_SUBDOMAINS if wordlist is None else wordlist)
     
-    output_progress(0)
+    cache = open_answer_cache(cache_path, refresh)
+    pool = ResolverPool(nameservers, concurrency=concurrency, rate=rate, retries=retries,
+                        timeout=timeout, trusted=trusted_nameservers, cache=cache)
     
-    for i, prefix in enumerate(COMMON_SUBDOMAINS):
-        subdomain = f"{prefix}.{domain}"
-        
-        ip_addresses = resolve_subdomain(subdomain)
-        if ip_addresses:
-            discovered.append(subdomain)
-            output_subdomain(subdomain, ip_addresses)
-        
-        # Update progress every 10 subdomains
-        if i % 10 == 0 or i == total - 1:
-            progress = int((i + 1) / total * 100)
-            output_progress(progress)
+    output_progress(0)
     
-    # Also check the root domain
-    root_ips = resolve_subdomain(domain)
-    if root_ips and domain not in discovered:
-        output_subdomain(domain, root_ips)
+    wildcards = WildcardDetector(pool, wildcard_probes) if wildcard_probes > 0 else None
+    scan = SubdomainScan(pool, concurrency, wildcards, permutation_budget, permutation_depth)
+    try:
+        asyncio.run(scan.run(domain, labels))
+    finally:
+        if cache is not None:
+            cache.close()
     
+    output_resolvers(pool.health(), cache.stats() if cache is not None else None)
+    output_wordlist(labels.stats())
     output_progress(100)
+    events.flush()
+
+def load_nameservers(spec: str = None, path: str = None) -> Optional[List[str]]:
+    """Nameservers from a comma-separated list and a file ('#' comments allowed), or None"""
+    nameservers = [entry.strip() for entry in (spec or '').split(',') if entry.strip()]
+    if path:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if line:
+                    nameservers.append(line)
+    return nameservers or None
 
 def main():
     parser = argparse.ArgumentParser(description='Subdomain Enumeration Scanner')
     parser.add_argument('domain', help='Target domain to scan (e.g., example.com)')
+    parser.add_argument('-w', '--wordlist', default=None,
+                        help='Wordlist file with one label per line (default: built-in top 100)')
+    parser.add_argument('--resolvers', default=None,
+                        help='Comma-separated nameserver IPs, optionally with :port '
+                             '(default: system resolvers)')
+    parser.add_argument('--resolvers-file', default=None,
+                        help='File with one nameserver per line, added to --resolvers')
+    parser.add_argument('--trusted-resolvers', default=None,
+                        help='Comma-separated nameservers that re-verify every positive answer')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum DNS queries in flight (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE,
+                        help=f'Queries per second per resolver, 0 for no cap (default: {DEFAULT_RATE})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'Retries after a timeout or server failure (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                        help=f'Seconds to wait for each answer (default: {DEFAULT_TIMEOUT})')
+    parser.add_argument('--wildcard-probes', type=int, default=WILDCARD_PROBES,
+                        help=f'Random labels resolved per zone to detect wildcard DNS '
+                             f'(default: {WILDCARD_PROBES})')
+    parser.add_argument('--no-wildcard-filter', action='store_true',
+                        help='Report names even when they only resolve through a wildcard')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                        help=f'SQLite DNS answer cache shared across scans (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor write the DNS answer cache')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Re-query every name, ignoring fresh cached answers (the cache is still updated)')
+    parser.add_argument('--permutations', action='store_true',
+                        help='Resolve permutations of found names (dev-api, api2, staging.api)')
+    parser.add_argument('--permutation-budget', type=int, default=DEFAULT_BUDGET,
+                        help=f'Maximum permutations resolved (default: {DEFAULT_BUDGET})')
+    parser.add_argument('--permutation-depth', type=int, default=DEFAULT_DEPTH,
+                        help=f'Rounds of permuting newly found names (default: {DEFAULT_DEPTH})')
     args = parser.parse_args()
     
     domain = args.domain.strip()
@@ -102,8 +334,36 @@ def main():
         output_error(f"Invalid domain: {domain}")
         sys.exit(1)
     
+    if args.concurrency < 1 or args.retries < 0 or args.wildcard_probes < 0 or args.rate < 0 or args.timeout <= 0:
+        output_error("Concurrency and timeout must be positive; retries, rate and wildcard "
+                     "probes must not be negative")
+        sys.exit(1)
+    
+    if args.permutation_budget < 1 or args.permutation_depth < 1:
+        output_error("Permutation budget and depth must be at least 1")
+        sys.exit(1)
+    
     try:
-        enumerate_subdomains(domain)
+        nameservers = load_nameservers(args.resolvers, args.resolvers_file)
+    except OSError as e:
+        output_error(f"Cannot read resolvers file: {e}")
+        sys.exit(1)
+    trusted = load_nameservers(args.trusted_resolvers)
+    
+    try:
+        enumerate_subdomains(domain, wordlist_file=args.wordlist, nameservers=nameservers,
+                             trusted_nameservers=trusted, concurrency=args.concurrency,
+                             rate=args.rate, retries=args.retries, timeout=args.timeout,
+                             wildcard_probes=0 if args.no_wildcard_filter else args.wildcard_probes,
+                             permutation_budget=args.permutation_budget if args.permutations else 0,
+                             permutation_depth=args.permutation_depth,
+                             cache_path=None if args.no_cache else args.cache, refresh=args.refresh)
+    except ValueError as e:
+        output_error(str(e))
+        sys.exit(1)
+    except OSError as e:
+        output_error(f"Cannot read wordlist: {e}")
+        sys.exit(1)
     except KeyboardInterrupt:
         output_error("Scan interrupted by user")
         sys.exit(1)
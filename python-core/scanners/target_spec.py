@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Target Specification
+Expands target specs (hostnames, IPs, CIDR blocks and IP ranges) lazily,
+so large networks are never materialized as lists
+"""
+
+import ipaddress
+from typing import Iterable, Iterator, Optional, Tuple
+
+def _parse_range(spec: str) -> Optional[Tuple[ipaddress._BaseAddress, ipaddress._BaseAddress]]:
+    """
+    Parse "10.0.0.1-10.0.0.50" or the short form "10.0.0.1-50"
+
+    Returns:
+        (first, last) addresses, or None when spec is not an IP range
+    """
+    start, sep, end = spec.partition('-')
+    if not sep:
+        return None
+    try:
+        first = ipaddress.ip_address(start.strip())
+    except ValueError:
+        # A hostname with a dash in it
+        return None
+
+    end = end.strip()
+    try:
+        last = ipaddress.ip_address(end)
+    except ValueError:
+        if first.version != 4 or not end.isdigit():
+            raise ValueError(f"Invalid IP range: {spec}")
+        # Short form replaces the last octet
+        last = ipaddress.ip_address(start.strip().rsplit('.', 1)[0] + '.' + end)
+
+    if last.version != first.version or last < first:
+        raise ValueError(f"Invalid IP range: {spec}")
+    return first, last
+
+def _parse_network(spec: str) -> Optional[ipaddress._BaseNetwork]:
+    """Parse a CIDR block, or return None when spec is not one"""
+    if '/' not in spec:
+        return None
+    try:
+        return ipaddress.ip_network(spec, strict=False)
+    except ValueError:
+        raise ValueError(f"Invalid CIDR block: {spec}")
+
+def _network_hosts(network: ipaddress._BaseNetwork) -> int:
+    """Number of addresses network.hosts() yields, without iterating it"""
+    if network.version == 4:
+        return network.num_addresses - 2 if network.prefixlen < 31 else network.num_addresses
+    # IPv6 hosts() skips the Subnet-Router anycast address
+    return network.num_addresses - 1 if network.prefixlen < 127 else network.num_addresses
+
+def count_target(spec: str) -> int:
+    """Number of hosts a spec expands to, computed without expanding it"""
+    network = _parse_network(spec)
+    if network is not None:
+        return _network_hosts(network)
+    address_range = _parse_range(spec)
+    if address_range is not None:
+        first, last = address_range
+        return int(last) - int(first) + 1
+    return 1
+
+def expand_target(spec: str) -> Iterator[str]:
+    """
+    Yield the hosts of one target spec
+
+    Args:
+        spec: Hostname, IP, CIDR block (10.0.0.0/24) or IP range
+              (10.0.0.1-10.0.0.50 or 10.0.0.1-50)
+
+    Raises:
+        ValueError: If spec looks like a CIDR block or range but is malformed
+    """
+    network = _parse_network(spec)
+    if network is not None:
+        for address in network.hosts():
+            yield str(address)
+        return
+
+    address_range = _parse_range(spec)
+    if address_range is not None:
+        first, last = address_range
+        for value in range(int(first), int(last) + 1):
+            yield str(type(first)(value))
+        return
+
+    yield spec
+
+def validate_targets(specs: Iterable[str]):
+    """Raise ValueError for the first malformed spec, before any scanning starts"""
+    for spec in specs:
+        if _parse_network(spec) is None:
+            _parse_range(spec)
+
+def count_targets(specs: Iterable[str]) -> int:
+    """Total hosts across all specs"""
+    return sum(count_target(spec) for spec in specs)
+
+def expand_targets(specs: Iterable[str]) -> Iterator[str]:
+    """Yield the hosts of every spec in turn"""
+    for spec in specs:
+        yield from expand_target(spec)
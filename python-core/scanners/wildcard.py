@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Wildcard DNS Detection
+Fingerprints wildcard records by resolving random labels under a zone,
+so names that only resolve through the wildcard can be filtered out
+"""
+
+import random
+import asyncio
+import string
+from typing import Dict, FrozenSet, Iterable
+
+try:
+    from .resolver_pool import STATUS_OK, ResolverPool
+except ImportError:
+    from resolver_pool import STATUS_OK, ResolverPool
+
+# Random labels resolved per zone; several catch wildcards that rotate answers
+WILDCARD_PROBES = 5
+LABEL_LENGTH = 16
+
+def random_label() -> str:
+    """A label no real zone is expected to contain"""
+    return ''.join(random.choices(string.ascii_lowercase + string.digits, k=LABEL_LENGTH))
+
+class WildcardDetector:
+    """
+    Per-zone wildcard fingerprints, probed once per zone on first use
+
+    A fingerprint is the set of every record the random labels resolved
+    to; a name whose records all fall inside its parent zone's fingerprint
+    is indistinguishable from the wildcard and is filtered.
+    """
+
+    def __init__(self, pool: ResolverPool, probes: int = WILDCARD_PROBES):
+        self.pool = pool
+        self.probes = probes
+        self.zones: Dict[str, asyncio.Task] = {}
+
+    async def fingerprint(self, zone: str) -> FrozenSet[str]:
+        """Records served by a wildcard under zone; empty when there is none"""
+        task = self.zones.get(zone)
+        if task is None:
+            # Shared by every name in the zone, so the zone is probed only once
+            task = self.zones[zone] = asyncio.ensure_future(self._probe(zone))
+        return await task
+
+    async def _probe(self, zone: str) -> FrozenSet[str]:
+        lookups = await asyncio.gather(*(
+            # Random names are never asked again, so they stay out of the answer cache
+            self.pool.resolve_many(f"{random_label()}.{zone}", cached=False) for _ in range(self.probes)
+        ))
+        records = set()
+        for answers in lookups:
+            for answer in answers.values():
+                if answer.status == STATUS_OK:
+                    records.update(answer.records)
+        return frozenset(records)
+
+    async def matches(self, name: str, records: Iterable[str], domain: str) -> bool:
+        """
+        Whether a resolved name only points at its parent zone's wildcard
+
+        Zones above the scanned domain are never probed, so the domain
+        itself (or a name outside it) does not match.
+        """
+        zone = name.partition('.')[2]
+        if zone != domain and not zone.endswith(f".{domain}"):
+            return False
+        fingerprint = await self.fingerprint(zone)
+        return bool(fingerprint) and all(record in fingerprint for record in records)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Wordlist Reader
+Streams subdomain labels from a memory-mapped wordlist file, normalized
+and deduplicated, reporting progress as the fraction of bytes consumed
+"""
+
+import os
+import re
+import mmap
+from typing import Iterable, Iterator, Optional
+
+try:
+    from .bloom import BloomFilter
+except ImportError:
+    from bloom import BloomFilter
+
+# Rough bytes per wordlist line, used to size the dedup filter from the file size
+AVERAGE_LINE_BYTES = 8
+MIN_CAPACITY = 1024
+
+# One or more DNS labels (letters, digits, hyphens, underscores)
+LABEL_PATTERN = re.compile(r'^[a-z0-9_](?:[a-z0-9_.-]{0,251}[a-z0-9_])?$')
+
+def normalize_label(line: str) -> Optional[str]:
+    """Lowercased label without surrounding dots and whitespace, or None for blanks, comments and junk"""
+    label = line.strip().strip('.').lower()
+    if not label or label.startswith('#') or '..' in label or not LABEL_PATTERN.match(label):
+        return None
+    return label
+
+class Wordlist:
+    """
+    Lazily yields the unique labels of a wordlist
+
+    Labels come from a file (memory-mapped, so only the pages being read
+    are resident) or from an in-memory list. Duplicates are dropped with a
+    Bloom filter sized from the input, keeping memory flat for wordlists
+    of millions of lines.
+
+    The filter is not confirmed against an exact set, so a unique label
+    is occasionally dropped as a false positive: about 0.1% of them
+    (bloom.DEFAULT_ERROR_RATE) within capacity, more when the file has
+    many more lines than its size suggests. stats() reports the estimate.
+    """
+
+    def __init__(self, path: str = None, labels: Iterable[str] = None):
+        self.path = path
+        self.labels = list(labels) if labels is not None else []
+        self.size = os.path.getsize(path) if path else len(self.labels)
+        self.offset = 0
+        self.seen = BloomFilter(max(MIN_CAPACITY, self.size // AVERAGE_LINE_BYTES if path else self.size))
+        self.skipped = 0
+        # Sum of the filter's false positive rate over every lookup: expected unique labels dropped
+        self.expected_lost = 0.0
+
+    def progress(self) -> float:
+        """Fraction of the input consumed so far"""
+        return self.offset / self.size if self.size else 1.0
+
+    def __iter__(self) -> Iterator[str]:
+        for label in (self._read_file() if self.path else self._read_list()):
+            self.expected_lost += self.seen.false_positive_rate()
+            if self.seen.add(label):
+                yield label
+            else:
+                self.skipped += 1
+        self.offset = self.size
+
+    def stats(self) -> dict:
+        """Labels yielded and skipped, and how many skips were likely false positives"""
+        return {
+            'labels': len(self.seen),
+            'skipped': self.skipped,
+            # An upper bound: true duplicates were counted as lookups too
+            'expected_lost': round(min(self.expected_lost, self.skipped), 2),
+        }
+
+    def _read_list(self) -> Iterator[str]:
+        for index, line in enumerate(self.labels):
+            self.offset = index
+            label = normalize_label(line)
+            if label is not None:
+                yield label
+
+    def _read_file(self) -> Iterator[str]:
+        if self.size == 0:
+            # mmap cannot map an empty file
+            return
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            while True:
+                line = mm.readline()
+                if not line:
+                    break
+                self.offset = mm.tell()
+                label = normalize_label(line.decode('utf-8', errors='ignore'))
+                if label is not None:
+                    yield label